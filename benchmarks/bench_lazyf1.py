@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Offline benchmarks for the lazyf1 data layer and dashboard.
+
+Runs against the fastf1 cache fixtures bundled under ``cache/`` with fastf1 in
+offline mode, so no network access is needed and runs are comparable between
+commits. The fixtures only contain the live timing artifacts, not the Ergast
+results or the event schedule, so the schedule is rebuilt from the fixture
+session info and results are given positions and points in finishing order.
+With points, rounds settle, so the ledger, the column store and the memoized
+aggregates and projections are exercised as they are with real data.
+
+    python benchmarks/bench_lazyf1.py --output before.json
+    python benchmarks/bench_lazyf1.py --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, REPO_DIR)
+
+import fastf1  # noqa: E402
+import fastf1.events  # noqa: E402
+import numpy as np  # noqa: E402
+
+import dashboard  # noqa: E402
+import f1cache  # noqa: E402
+import f1data  # noqa: E402
+from common import DashboardSnapshot  # noqa: E402
+from tests.fixtures import FIXTURE_CACHE, FIXTURE_YEAR, fixture_schedule, score_results  # noqa: E402
+
+
+class Benchmark:
+    def __init__(self, work_dir, repeat):
+        self.work_dir = work_dir
+        self.repeat = repeat
+        self.cache_dir = os.path.join(work_dir, "cache")
+        self.snapshot_file = os.path.join(work_dir, "snapshot.json")
+        self.ledger_count = 0
+
+    def setup(self):
+        # fastf1 may write to its cache, so work on a copy of the fixtures
+        shutil.copytree(FIXTURE_CACHE, self.cache_dir)
+        f1data.initialize_fastf1(self.cache_dir)
+        fastf1.Cache.offline_mode(True)
+        # get_session looks the event up through fastf1.events, so patch both entry points
+        fastf1.get_event_schedule = fixture_schedule
+        fastf1.events.get_event_schedule = fixture_schedule
+        load_round_results = f1data._load_round_results
+        f1data._load_round_results = lambda *session: score_results(load_round_results(*session))
+        f1cache.cache_usage = f1cache.CacheUsage(os.path.join(self.work_dir, "cache_usage.sqlite"))
+        logging.basicConfig(filename=os.path.join(self.work_dir, "bench.log"), level=logging.INFO)
+        # Ergast requests fail in offline mode; fastf1 falls back to the live timing data
+        warnings.filterwarnings("ignore", module="fastf1")
+
+    def reset(self):
+        """Drop every in-memory and persisted cache so the next call runs cold"""
+        f1data._season_aggregates.clear()
+        f1data._projections.clear()
+        f1data._session_laps.clear()
+        f1data._session_timelines.clear()
+        f1data._head_to_heads.clear()
+        f1data.schedule_cache.invalidate()
+        self.ledger_count += 1
+        f1data.results_ledger = f1data.ResultsLedger(
+            os.path.join(self.work_dir, f"results-{self.ledger_count}.sqlite"),
+            os.path.join(self.work_dir, f"store-{self.ledger_count}"))
+
+    def f1_data(self):
+        f1_data = f1data.F1Data()
+        f1_data.current_year = FIXTURE_YEAR
+        return f1_data
+
+    def time_call(self, name, call):
+        """Time a call cold with its peak memory, then warm over several repeats"""
+        self.reset()
+        f1_data = self.f1_data()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        call(f1_data)
+        cold = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        warm = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            call(f1_data)
+            warm.append(time.perf_counter() - start)
+
+        return {
+            f"{name}.cold_s": cold,
+            f"{name}.warm_s": statistics.median(warm),
+            f"{name}.peak_mem_bytes": peak
+        }
+
+    async def dashboard_paint(self):
+        shown, refreshed = {}, {}
+        show_data = dashboard.LoadableWidget.show_data
+        finish_loading = dashboard.LoadableWidget.finish_loading
+
+        def record_show(panel, data, stale_since=None):
+            show_data(panel, data, stale_since)
+            shown.setdefault(panel.id, time.perf_counter())
+
+        def record_refresh(panel, data):
+            # Fresh data equal to the saved data is confirmed without rendering it again
+            finish_loading(panel, data)
+            refreshed.setdefault(panel.id, time.perf_counter())
+
+        class BenchmarkApp(dashboard.F1DashboardApp):
+            first_paint = None
+
+            def on_mount(self):
+                super().on_mount()
+                self.call_after_refresh(self.record_first_paint)
+
+            def record_first_paint(self):
+                self.first_paint = time.perf_counter()
+
+        app = BenchmarkApp(f1_data=self.f1_data(), snapshot=DashboardSnapshot(self.snapshot_file),
+                           season=FIXTURE_YEAR)
+        dashboard.LoadableWidget.show_data = record_show
+        dashboard.LoadableWidget.finish_loading = record_refresh
+        start = time.perf_counter()
+        try:
+            async with app.run_test(headless=True, size=(200, 60)) as pilot:
+                # Lap analysis, race control, head to head and the championship only load once focused
+                panels = [panel.id for panel in app.query(dashboard.LoadableWidget)
+                          if not isinstance(panel, dashboard.OnDemandWidget)]
+                while not all(panel in refreshed for panel in panels) or app.first_paint is None:
+                    await pilot.pause(0.01)
+        finally:
+            dashboard.LoadableWidget.show_data = show_data
+            dashboard.LoadableWidget.finish_loading = finish_loading
+        # Time until the first frame, until every panel shows data, saved or fresh, and
+        # until every panel shows fresh data
+        useful_paint = max(shown[panel] for panel in panels)
+        data_paint = max(refreshed[panel] for panel in panels)
+        return app.first_paint - start, useful_paint - start, data_paint - start
+
+    def time_dashboard(self):
+        results = {}
+        # cold: no caches or snapshot; warm: everything cached; snapshot: data caches
+        # dropped but the snapshot saved by the previous runs kept
+        for label in ("cold", "warm", "snapshot"):
+            if label != "warm":
+                self.reset()
+            if label == "cold" and os.path.exists(self.snapshot_file):
+                os.remove(self.snapshot_file)
+            first_paint, useful_paint, data_paint = asyncio.run(self.dashboard_paint())
+            results[f"dashboard.first_paint.{label}_s"] = first_paint
+            results[f"dashboard.useful_paint.{label}_s"] = useful_paint
+            results[f"dashboard.data_paint.{label}_s"] = data_paint
+        return results
+
+    def time_title_odds(self):
+        """Time the title odds simulation of the fixture season's field over a full season still to race"""
+        self.reset()
+        aggregate = self.f1_data().get_season_aggregate()
+        drivers, teams = aggregate["drivers"], aggregate["teams"]
+        team_index = {team: index for index, team in enumerate(teams['team'])}
+        driver_points = drivers['points'].to_numpy(dtype=np.float32)
+        team_points = teams['points'].to_numpy(dtype=np.float32)
+        driver_teams = np.array([team_index.get(team, -1) for team in drivers['team']], dtype=int)
+        strengths = f1data.race_strengths(aggregate["driver_points"])
+        sessions = tuple(f1data.RACE_POINTS for _ in range(24))
+        times = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            f1data.project_championship(driver_points, team_points, driver_teams, strengths, sessions,
+                                        f1data.TITLE_ODDS_RUNS)
+            times.append(time.perf_counter() - start)
+        return {"title_odds.24_rounds_s": statistics.median(times)}
+
+    def run(self):
+        self.setup()
+        metrics = {}
+        metrics.update(self.time_call("get_race_results", lambda f1_data: f1_data.get_race_results(-1)))
+        metrics.update(self.time_call("get_driver_standings", lambda f1_data: f1_data.get_driver_standings()))
+        metrics.update(self.time_call("get_team_standings", lambda f1_data: f1_data.get_team_standings()))
+        metrics.update(self.time_call("get_race_schedule", lambda f1_data: f1_data.get_race_schedule()))
+        metrics.update(self.time_call("get_lap_analysis", lambda f1_data: f1_data.get_lap_analysis(-1, width=40)))
+        metrics.update(self.time_call("get_race_timeline", lambda f1_data: f1_data.get_race_timeline(-1)))
+        metrics.update(self.time_call("get_head_to_head", lambda f1_data: f1_data.get_head_to_head(race_index=-1, width=50)))
+        metrics.update(self.time_call("get_championship", lambda f1_data: f1_data.get_championship(width=20)))
+        metrics.update(self.time_title_odds())
+        metrics.update(self.time_dashboard())
+        return metrics
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(metrics, baseline):
+    print(f"{'metric':45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in metrics.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:45} {'-':>12} {value:12.4g} {'':>8}")
+            continue
+        change = f"{(value - before) / before:+.0%}" if before else ""
+        print(f"{name:45} {before:12.4g} {value:12.4g} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--repeat", type=int, default=5, help="number of warm runs per call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="lazyf1-bench-") as work_dir:
+        metrics = Benchmark(work_dir, args.repeat).run()
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "fastf1": fastf1.__version__,
+        "metrics": metrics
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(metrics, json.load(f)["metrics"])
+    else:
+        for name, value in metrics.items():
+            print(f"{name:45} {value:12.4g}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Startup budget check for lazyf1.
+
+Measures, in fresh processes, how long the plain script takes to reach its first
+frame and to print its help. When the PyInstaller one-file build from lazyf1.spec
+exists, it also measures how long the build takes to print its help and to draw the
+dashboard in a pseudo-terminal, starting cold with an empty home directory. Each
+measurement is compared against its budget and the script exits non-zero when one
+is exceeded.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --binary dist/lazyf1 --output startup.json
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import pty
+import select
+import signal
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import termios
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets in seconds, measured from process start
+BUDGETS = {
+    "script.help_s": 0.3,
+    "script.first_frame_s": 1.0,
+    # The one-file build unpacks itself to a temp dir on every start
+    "binary.help_s": 3.0,
+    "binary.first_frame_s": 4.0
+}
+
+# Text of the first frame the dashboard draws, and how long to wait for it
+FIRST_FRAME_MARKER = b"Driver Standings"
+FIRST_FRAME_TIMEOUT = 30
+
+# Terminal size the build is started in, as rows and columns
+TERMINAL_SIZE = (50, 160)
+
+# Runs the dashboard headless and reports when the first frame has been rendered. It also
+# reports whether the entry path imported the data layer's heavy dependencies itself; once
+# the app runs they are imported by the panels' worker threads, off the event loop.
+FIRST_FRAME_PROGRAM = """
+import sys
+sys.path.insert(0, {repo_dir!r})
+import common
+common.initialize()
+from dashboard import F1DashboardApp
+heavy = [name for name in ("fastf1", "pandas") if name in sys.modules]
+
+class FirstFrameApp(F1DashboardApp):
+    def on_mount(self):
+        super().on_mount()
+        self.call_after_refresh(self.report_first_frame)
+
+    def report_first_frame(self):
+        print("first-frame", ",".join(heavy), flush=True)
+        self.exit()
+
+FirstFrameApp().run(headless=True)
+"""
+
+
+def time_command(command, env, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def time_first_frame(env, repeat):
+    """Time from process start until the first frame, and the heavy modules imported by then"""
+    program = FIRST_FRAME_PROGRAM.format(repo_dir=REPO_DIR)
+    timings = []
+    heavy = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "-c", program], env=env, text=True,
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for line in process.stdout:
+            if line.startswith("first-frame"):
+                timings.append(time.perf_counter() - start)
+                heavy = line.split(" ", 1)[1].strip()
+                break
+        process.kill()
+        process.wait()
+    if not timings:
+        raise RuntimeError("dashboard exited before rendering its first frame")
+    return statistics.median(timings), heavy
+
+
+def time_terminal_first_frame(command, env, repeat):
+    """Time from starting a command in a pseudo-terminal until it draws the dashboard"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pid, fd = pty.fork()
+        if pid == 0:
+            fcntl.ioctl(sys.stdout.fileno(), termios.TIOCSWINSZ, struct.pack("HHHH", *TERMINAL_SIZE, 0, 0))
+            os.execve(command[0], command, dict(env, TERM="xterm-256color"))
+        output = b""
+        try:
+            while FIRST_FRAME_MARKER not in output and time.perf_counter() - start < FIRST_FRAME_TIMEOUT:
+                if select.select([fd], [], [], 0.1)[0]:
+                    try:
+                        output += os.read(fd, 65536)
+                    except OSError:
+                        break
+            if FIRST_FRAME_MARKER in output:
+                timings.append(time.perf_counter() - start)
+        finally:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            os.close(fd)
+    if not timings:
+        raise RuntimeError(f"{command[0]} did not draw the dashboard within {FIRST_FRAME_TIMEOUT}s")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--binary", default=os.path.join(REPO_DIR, "dist", "lazyf1"),
+                        help="PyInstaller one-file build to time, skipped when missing")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs per measurement")
+    parser.add_argument("--output", help="write the measurements as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="lazyf1-startup-") as home:
+        # Keep logs, caches and ledgers of these runs out of the real ~/.f1dashboard
+        env = dict(os.environ, HOME=home)
+        metrics = {
+            "script.help_s": time_command([sys.executable, os.path.join(REPO_DIR, "lazyf1.py"), "--help"],
+                                          env, args.repeat)
+        }
+        metrics["script.first_frame_s"], heavy = time_first_frame(env, args.repeat)
+        if os.path.exists(args.binary):
+            metrics["binary.help_s"] = time_command([args.binary, "--help"], env, args.repeat)
+            # A fresh home directory per run, so each start is cold
+            cold = []
+            for _ in range(args.repeat):
+                with tempfile.TemporaryDirectory(prefix="lazyf1-cold-") as cold_home:
+                    cold.append(time_terminal_first_frame([args.binary], dict(env, HOME=cold_home), 1))
+            metrics["binary.first_frame_s"] = statistics.median(cold)
+
+    over_budget = False
+    for name, value in metrics.items():
+        budget = BUDGETS[name]
+        status = "ok" if value <= budget else "OVER"
+        over_budget = over_budget or value > budget
+        print(f"{name:25} {value:8.3f}s  budget {budget:.1f}s  {status}")
+    if heavy:
+        print(f"Imported by the entry path before the app started: {heavy}")
+    if "binary.help_s" not in metrics:
+        print(f"No one-file build at {args.binary}; build it with: pyinstaller lazyf1.spec")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"metrics": metrics, "budgets": BUDGETS}, f, indent=2)
+
+    sys.exit(1 if over_budget or heavy else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Headless commands printing lazyf1 data as text, JSON or CSV.
+
+These never import Textual or rich, so they start quickly enough for cron jobs and
+status bar scripts. They use the same F1Data service, fastf1 cache and results ledger
+as the dashboard. The cache commands do not import fastf1 either.
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+import common
+import f1cache
+
+
+def add_commands(subparsers):
+    """Register the headless subcommands on the lazyf1 argument parser"""
+    standings = subparsers.add_parser("standings", help="print driver or constructor standings")
+    standings.add_argument("table", choices=["drivers", "teams"], help="which standings to print")
+    add_output_arguments(standings)
+    standings.set_defaults(command=run_standings)
+
+    results = subparsers.add_parser("results", help="print the results of a race")
+    results.add_argument("--round", type=int, help="round number (default: most recent completed race)")
+    add_output_arguments(results)
+    results.set_defaults(command=run_results)
+
+    schedule = subparsers.add_parser("schedule", help="print the race schedule")
+    add_output_arguments(schedule)
+    schedule.set_defaults(command=run_schedule)
+
+    index = subparsers.add_parser("index", help="store whole seasons in the local season index")
+    index.add_argument("years", type=int, nargs="+", metavar="YEAR", help="seasons to index")
+    index.set_defaults(command=run_index, year=None)
+
+    cache = subparsers.add_parser("cache", help="inspect or prune the fastf1 cache")
+    cache_commands = cache.add_subparsers(metavar="ACTION", required=True)
+    cache_stats = cache_commands.add_parser("stats", help="print size and hit rate per season")
+    cache_stats.add_argument("--json", dest="output", action="store_const", const="json", default="text",
+                             help="print JSON")
+    cache_stats.set_defaults(command=run_cache_stats, uses_data=False)
+    cache_prune = cache_commands.add_parser("prune", help="remove least recently used data beyond a budget")
+    cache_prune.add_argument("--budget", type=parse_size, default=f1cache.CACHE_BUDGET_BYTES,
+                             help="size to prune down to, such as 500M or 2G (default: %(default)s bytes)")
+    cache_prune.set_defaults(command=run_cache_prune, uses_data=False)
+
+
+def add_output_arguments(parser):
+    parser.add_argument("--year", type=int, help="season (default: current year)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", dest="output", action="store_const", const="json", help="print JSON records")
+    output.add_argument("--csv", dest="output", action="store_const", const="csv", help="print CSV with a header row")
+    parser.set_defaults(output="text")
+
+
+def run(args):
+    """Run a headless command and return its exit status"""
+    if not getattr(args, "uses_data", True):
+        return args.command(None, args)
+
+    import f1data
+
+    f1data.initialize_fastf1()
+    f1_data = f1data.F1Data()
+    if args.year is not None:
+        f1_data.current_year = args.year
+    return args.command(f1_data, args)
+
+
+def run_standings(f1_data, args):
+    typed = args.output != "text"
+    if args.table == "drivers":
+        frame = f1_data.get_driver_standings(typed=typed)
+        columns = common.DRIVER_STANDINGS_COLUMNS
+    else:
+        frame = f1_data.get_team_standings(typed=typed)
+        columns = common.TEAM_STANDINGS_COLUMNS
+    return write_table(frame, columns, args.output)
+
+
+def run_results(f1_data, args):
+    race_index = -1
+    if args.round is not None:
+        try:
+            race_index = f1_data.get_race_index(args.round)
+        except Exception:
+            print(f"lazyf1: failed to load the {f1_data.current_year} schedule, see {common.log_file}", file=sys.stderr)
+            return 1
+        if race_index is None:
+            print(f"lazyf1: round {args.round} of {f1_data.current_year} has not been completed", file=sys.stderr)
+            return 1
+
+    frame = f1_data.get_race_results(race_index, typed=args.output != "text")
+    if args.output == "text" and not frame.empty and not load_failed(frame):
+        print(f"Race Results {frame['race_name'].iloc[0]} {f1_data.current_year}")
+        return write_table(frame, common.RACE_RESULTS_COLUMNS[:-1], args.output)
+    return write_table(frame, common.RACE_RESULTS_COLUMNS, args.output)
+
+
+def run_schedule(f1_data, args):
+    return write_table(f1_data.get_race_schedule(typed=args.output != "text"), common.SCHEDULE_COLUMNS, args.output)
+
+
+def run_index(f1_data, args):
+    """Load every completed round of each season into the season index
+
+    Rounds are stored as they load, so an interrupted run picks up where it stopped.
+    """
+    status = 0
+    for year in args.years:
+        try:
+            aggregate = f1_data.get_season_aggregate(year)
+        except Exception as e:
+            print(f"{year}: failed to load the schedule: {e}", file=sys.stderr)
+            status = 1
+            continue
+        failed = sorted(aggregate["failed_rounds"])
+        message = f"{year}: indexed {len(aggregate['rounds']) - len(failed)} of {len(aggregate['rounds'])} completed rounds"
+        if failed:
+            message += f", failed rounds {', '.join(map(str, failed))}"
+            status = 1
+        print(message)
+    return status
+
+
+def run_cache_stats(f1_data, args):
+    seasons = f1cache.stats()
+    if args.output == "json":
+        json.dump({str(year): season for year, season in seasons.items()}, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    print(f"{'season':>6}  {'sessions':>8}  {'size':>9}  {'heavy':>9}  {'hits':>5}  {'misses':>6}  {'hit rate':>8}")
+    for year, season in seasons.items():
+        hit_rate = "-" if season["hit_rate"] is None else f"{season['hit_rate']:.0%}"
+        print(f"{year:>6}  {season['sessions']:>8}  {format_size(season['size_bytes']):>9}  "
+              f"{format_size(season['heavy_bytes']):>9}  {season['hits']:>5}  {season['misses']:>6}  {hit_rate:>8}")
+    print(f"Total cache size {format_size(f1cache.cache_size())} in {common.cache_dir}")
+    return 0
+
+
+def run_cache_prune(f1_data, args):
+    report = f1cache.prune(args.budget)
+    print(f"Freed {format_size(report['freed_bytes'])}: trimmed {report['trimmed_sessions']} sessions, "
+          f"removed {report['removed_sessions']}; cache is now {format_size(report['size_bytes'])}")
+    return 0
+
+
+def parse_size(text):
+    """Parse a byte count with an optional K, M or G suffix"""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper().removesuffix("B")
+    try:
+        if text and text[-1] in units:
+            return int(float(text[:-1]) * units[text[-1]])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+
+
+def format_size(size):
+    for unit in ("B", "K", "M"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+
+def load_failed(frame):
+    """Whether a table from F1Data is the placeholder it reports failures with"""
+    return not frame.empty and str(frame.iloc[0, 0]) == "Error"
+
+
+def write_table(frame, columns, output):
+    """Print a table from F1Data and return the exit status
+
+    Text output takes display tables; JSON and CSV take typed ones, whose missing values
+    are written as null and as empty fields.
+    """
+    frame = frame[columns]
+    if load_failed(frame):
+        print(f"lazyf1: failed to load data, see {common.log_file}", file=sys.stderr)
+        return 1
+
+    # Plain Python values, so numbers serialize as numbers
+    rows = frame.astype(object).where(frame.notna(), None).values.tolist()
+    if output == "json":
+        json.dump([dict(zip(columns, row)) for row in rows], sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif output == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    else:
+        widths = [max([len(column)] + [len(row[i]) for row in rows]) for i, column in enumerate(columns)]
+        for row in [columns] + rows:
+            print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+    return 0
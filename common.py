@@ -0,0 +1,193 @@
+"""Paths and helpers shared by the lazyf1 modules.
+
+Only the standard library is imported here, so the entry point and the dashboard can
+use this module without pulling in fastf1 or pandas.
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+# Everything lazyf1 writes lives under ~/.f1dashboard
+data_dir = os.path.join(os.path.expanduser("~"), ".f1dashboard")
+log_file = os.path.join(data_dir, "f1dashboard.log")
+cache_dir = os.path.join(data_dir, "cache")
+
+# Results extracted from completed rounds, persisted across runs
+ledger_file = os.path.join(data_dir, "results.sqlite")
+# Memory-mapped columnar copies of the ledger, see f1data.ColumnStore
+store_dir = os.path.join(data_dir, "store")
+
+# Last data shown by each dashboard panel, painted on the next launch
+snapshot_file = os.path.join(data_dir, "snapshot.json")
+
+# Per-season hit and miss counts of the fastf1 cache
+cache_usage_file = os.path.join(data_dir, "cache_usage.sqlite")
+
+# Live timing streams recorded while they are shown, which can be replayed later
+live_dir = os.path.join(data_dir, "live")
+
+# Columns of the display-ready tables returned by F1Data, in table order
+DRIVER_STANDINGS_COLUMNS = ["position", "driver", "team", "points", "wins"]
+TEAM_STANDINGS_COLUMNS = ["position", "team", "nationality", "points", "wins"]
+SCHEDULE_COLUMNS = ["round", "name", "circuit", "date", "status"]
+RACE_RESULTS_COLUMNS = ["position", "driver", "team", "time", "points", "race_name"]
+LAP_ANALYSIS_COLUMNS = ["driver", "fastest", "lap", "delta", "trace", "race_name"]
+RACE_TIMELINE_COLUMNS = ["time", "lap", "type", "message"]
+CHAMPIONSHIP_COLUMNS = ["position", "name", "points", "progression", "projected", "odds", "remaining"]
+
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def initialize():
+    """Create the data directories and set up logging to file"""
+    os.makedirs(cache_dir, exist_ok=True)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        filename=log_file,
+        filemode='a'
+    )
+    redirect_fastf1_logs()
+
+
+def redirect_fastf1_logs():
+    """Send FastF1 logs to the log file instead of the terminal
+
+    fastf1 attaches a console handler when it is imported, so this runs again once the
+    data layer has imported it.
+    """
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    for logger_name in ["fastf1", "fastf1.core", "fastf1.api", "fastf1.ergast", "fastf1.plotting"]:
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(logging.INFO)
+        # Remove any existing handlers
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        # Add file handler
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+
+
+class LoadingState:
+    """Class to manage loading state for widgets
+
+    Loads may overlap when several panels share one data service, so the state stays
+    loading until every load has finished. Callbacks go through ``dispatch`` so the app
+    can run them on its event loop when loads happen in worker threads.
+    """
+    def __init__(self):
+        self.is_loading = False
+        self.loading_message = ""
+        self.callbacks = []
+        self.dispatch = None
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def set_loading(self, is_loading, message="Loading data..."):
+        with self._lock:
+            self._active = self._active + 1 if is_loading else max(0, self._active - 1)
+            self.is_loading = self._active > 0
+            if is_loading:
+                self.loading_message = message
+            is_loading, message = self.is_loading, self.loading_message
+        for callback in self.callbacks:
+            if self.dispatch is not None:
+                self.dispatch(callback, is_loading, message)
+            else:
+                callback(is_loading, message)
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+
+class RequestCoalescer:
+    """Runs concurrent requests for the same key once and hands the result to every caller"""
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def run(self, key, fn, *args):
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+class DashboardSnapshot:
+    """Last successfully rendered data of each dashboard panel, kept on disk
+
+    Panels store the plain rows they rendered, keyed by panel id, so the next launch can
+    paint them straight away while fresh data loads in the background.
+    """
+    def __init__(self, path=snapshot_file):
+        self.path = path
+        self._lock = threading.Lock()
+        self.panels = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                panels = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.error(f"Error reading dashboard snapshot: {e}")
+            return {}
+        return panels if isinstance(panels, dict) else {}
+
+    def get(self, panel_id):
+        """Return the saved entry for a panel, with ``saved_at`` and ``data``, or None"""
+        with self._lock:
+            return self.panels.get(panel_id)
+
+    def save(self, panel_id, data):
+        """Replace a panel's entry and rewrite the file atomically"""
+        with self._lock:
+            self.panels[panel_id] = {
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "data": data
+            }
+            # A temporary file of its own, so other lazyf1 instances saving at the same time do not mix
+            temp_path = None
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix=f"{os.path.basename(self.path)}.", suffix=".tmp",
+                                                 dir=os.path.dirname(self.path) or ".")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.panels, f, separators=(",", ":"))
+                os.replace(temp_path, self.path)
+                temp_path = None
+            except (OSError, TypeError, ValueError) as e:
+                logging.error(f"Error writing dashboard snapshot: {e}")
+            finally:
+                if temp_path is not None:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
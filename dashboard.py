@@ -0,0 +1,1481 @@
+"""Textual dashboard for lazyf1."""
+
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from rich.table import Table
+from rich.panel import Panel
+from rich.spinner import Spinner
+from rich.text import Text
+from rich.align import Align
+from rich.console import Group
+from textual import work
+from textual.app import App
+from textual.screen import Screen
+from textual.widgets import Header, Footer, Static, Button, ContentSwitcher
+from textual.containers import Container, Horizontal
+from textual.reactive import reactive
+from textual.binding import Binding
+from textual.worker import get_current_worker
+
+import livetiming
+import timing
+from common import (
+    CHAMPIONSHIP_COLUMNS, DRIVER_STANDINGS_COLUMNS, LAP_ANALYSIS_COLUMNS, RACE_RESULTS_COLUMNS, RACE_TIMELINE_COLUMNS,
+    SCHEDULE_COLUMNS, TEAM_STANDINGS_COLUMNS, DashboardSnapshot, LoadingState, log_file
+)
+
+# Define TokyoNight colors
+TOKYO_NIGHT = {
+    "background": "#1a1b26",
+    "foreground": "#c0caf5",
+    "black": "#15161e",
+    "red": "#f7768e",
+    "green": "#9ece6a",
+    "yellow": "#e0af68",
+    "blue": "#7aa2f7",
+    "magenta": "#bb9af7",
+    "cyan": "#7dcfff",
+    "white": "#a9b1d6",
+    "bright_black": "#414868",
+    "bright_red": "#f7768e",
+    "bright_green": "#9ece6a",
+    "bright_yellow": "#e0af68",
+    "bright_blue": "#7aa2f7",
+    "bright_magenta": "#bb9af7",
+    "bright_cyan": "#7dcfff",
+    "bright_white": "#c0caf5",
+    "accent": "#7aa2f7"
+}
+
+# Status column colours in the race schedule
+STATUS_STYLES = {
+    "Completed": TOKYO_NIGHT["green"],
+    "In Progress": TOKYO_NIGHT["yellow"]
+}
+
+# Tyre compound colours in the head-to-head stint overlay
+COMPOUND_STYLES = {
+    "SOFT": TOKYO_NIGHT["red"],
+    "MEDIUM": TOKYO_NIGHT["yellow"],
+    "HARD": TOKYO_NIGHT["bright_white"],
+    "INTERMEDIATE": TOKYO_NIGHT["green"],
+    "WET": TOKYO_NIGHT["blue"]
+}
+
+# Earliest season offered; seasons before 2018 only have results, from the Ergast mirror
+FIRST_SEASON = 1950
+
+# Frame interval of the loading spinners, in seconds
+SPINNER_INTERVAL = 0.1
+
+# Neighbouring races formatted ahead of P/N navigation, and the memory budget for formatted results
+RESULTS_PREFETCH_DEPTH = 1
+RESULTS_CACHE_BYTES = 2 * 1024 * 1024
+
+# Columns taken by everything in the lap analysis panel except the sparklines
+LAP_TABLE_CHROME = 40
+
+# Columns taken by everything in the championship panel except the progression sparklines
+CHAMPIONSHIP_CHROME = 50
+
+# Columns taken by the head-to-head panel's borders and axis labels, and rows taken by its
+# borders, lap axis, stint overlay, legend and final delta
+HEAD_TO_HEAD_CHROME = 14
+HEAD_TO_HEAD_CHROME_ROWS = 9
+# Width of the head-to-head axis labels
+CHART_LABEL_WIDTH = 8
+
+# Rows taken by the race control panel's border, title and table header, and rows scrolled
+# per mouse wheel step
+TIMELINE_CHROME = 7
+TIMELINE_SCROLL_ROWS = 3
+
+# Panel ids in the order tab moves focus through them
+PANEL_ORDER = ["drivers_panel", "teams_panel", "schedule_panel", "results_panel", "laps_panel", "control_panel",
+               "compare_panel", "championship_panel"]
+
+# Most live timing frames drawn per second; deltas arriving in between are batched
+LIVE_FRAME_RATE = 10
+
+
+class AnimationTicker:
+    """One timer animating every spinner on screen
+
+    Widgets showing a spinner subscribe while it is visible; the timer is paused
+    whenever nothing is subscribed, so an idle dashboard does no animation work.
+    """
+    def __init__(self, app, interval=SPINNER_INTERVAL):
+        self.app = app
+        self.interval = interval
+        self.widgets = set()
+        self.timer = None
+
+    def add(self, widget):
+        self.widgets.add(widget)
+        if self.timer is None:
+            self.timer = self.app.set_interval(self.interval, self.tick)
+        else:
+            self.timer.resume()
+
+    def discard(self, widget):
+        self.widgets.discard(widget)
+        if not self.widgets and self.timer is not None:
+            self.timer.pause()
+
+    def tick(self):
+        for widget in list(self.widgets):
+            widget.refresh()
+
+
+def table_rows(frame, columns):
+    """Plain rows of a display table, which render and serialize without pandas"""
+    return frame[columns].values.tolist()
+
+
+def fill_table(table, rows):
+    """Add plain rows to an empty rich Table and return it"""
+    for row in rows:
+        table.add_row(*row)
+    return table
+
+
+def gap_chart(values, height, cell, up_style, down_style):
+    """Lines of a bar chart of values drawn from a zero line, each value cell columns wide"""
+    low, high = min(0.0, min(values)), max(0.0, max(values))
+    if high - low < 1e-9:
+        high = low + 1
+    scale = (height - 1) / (high - low)
+    zero = round(high * scale)
+    tops = [round((high - value) * scale) for value in values]
+    lines = []
+    for row in range(height):
+        if row == 0:
+            label = f"{high:+.1f}s"
+        elif row == height - 1:
+            label = f"{low:+.1f}s"
+        else:
+            label = "0" if row == zero else ""
+        line = Text(label.rjust(CHART_LABEL_WIDTH - 1) + " ", style=TOKYO_NIGHT["white"])
+        for value, top in zip(values, tops):
+            if top != zero and min(top, zero) <= row <= max(top, zero):
+                line.append("█" * cell, style=up_style if value > 0 else down_style)
+            elif row == zero:
+                line.append("─" * cell, style=TOKYO_NIGHT["bright_black"])
+            else:
+                line.append(" " * cell)
+        lines.append(line)
+    return lines
+
+
+class LoadableWidget(Static):
+    """Base class for widgets that can show loading state
+
+    Data is fetched by ``fetch_data`` in a background thread worker and handed back to
+    ``render_data`` on the event loop, so slow fastf1 loads never block input. Fetched
+    data is plain rows, which the app's snapshot saves so the next launch can paint them
+    before the first fetch finishes, and which are compared with the rows on screen so
+    unchanged data is not rendered again. Changed data is drawn into a fresh table from
+    ``build_table``, kept in the same panel.
+    """
+    panel_title = ""
+    border_style = TOKYO_NIGHT["blue"]
+    loading_message = "Loading..."
+    can_focus = True
+
+    def __init__(self, *args, loading_state=None, f1_data=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loading_state = loading_state
+        self._f1_data = f1_data
+        self.is_loading = False
+        # Table on screen, rebuilt from the rows on every render, and the panel kept around it
+        self.table = None
+        self.table_panel = None
+        # When the data on screen came from the snapshot, the time it was saved
+        self.stale_since = None
+        # Data on screen, or None while something else is shown
+        self.rendered_data = None
+        if loading_state:
+            loading_state.add_callback(self.on_loading_changed)
+
+    @property
+    def f1_data(self):
+        """Data service for this panel, defaulting to the app's shared one"""
+        return self._f1_data if self._f1_data is not None else self.app.f1_data
+
+    def on_mount(self):
+        self.paint_snapshot()
+        self.update_content()
+
+    def on_loading_changed(self, is_loading, message):
+        self.loading_message = message
+        if self.is_loading:
+            self.show_loading()
+
+    def paint_snapshot(self):
+        """Paint the data saved by the last run, marked stale until fresh data arrives"""
+        entry = self.app.snapshot.get(self.id) if self.id else None
+        if entry is None:
+            return
+        try:
+            self.show_data(entry["data"], stale_since=entry["saved_at"])
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logging.error(f"Ignoring saved data for {self.id}: {e}")
+            self.set_stale(None)
+
+    def update_content(self, background=False):
+        """Fetch fresh data in the background, showing the loading panel meanwhile
+
+        Background refreshes and saved data keep the current data on screen instead.
+        """
+        self.is_loading = True
+        if not background and self.stale_since is None:
+            self.show_loading()
+        self.load_data(**self.fetch_arguments())
+
+    def fetch_arguments(self):
+        """Arguments captured on the event loop and passed to fetch_data"""
+        return {"year": self.app.season}
+
+    def fetch_data(self, **kwargs):
+        """Load the widget's data as plain rows; runs in a worker thread"""
+        raise NotImplementedError
+
+    def build_table(self):
+        """Create the panel's table with its columns and no rows"""
+        raise NotImplementedError
+
+    def table_title(self, data):
+        raise NotImplementedError
+
+    def render_data(self, data):
+        """Render data returned by fetch_data; runs on the event loop"""
+        with timing.span(f"render.{self.id}"):
+            self.table = fill_table(self.build_table(), data["rows"])
+            self.table.title = self.table_title(data)
+            self.update(self.show_table(self.table))
+
+    def show_table(self, table):
+        """The panel around the table on screen, made on the first render"""
+        if self.table_panel is None:
+            self.table_panel = Panel(table, border_style=self.border_style)
+        self.table_panel.renderable = table
+        return self.table_panel
+
+    def is_complete(self, data):
+        """Whether data is worth saving and replacing saved data with"""
+        return bool(data["rows"]) and data["rows"][0][0] != "Error"
+
+    def is_snapshot(self, data):
+        """Whether data is what the panel shows on launch, and so worth saving"""
+        return self.is_complete(data) and data["year"] == self.app.default_season
+
+    @work(thread=True, exclusive=True, group="load")
+    def load_data(self, **kwargs):
+        worker = get_current_worker()
+        with timing.span(f"fetch.{self.id}"):
+            data = self.fetch_data(**kwargs)
+        # A newer request for this widget supersedes this one
+        if not worker.is_cancelled:
+            if self.is_snapshot(data):
+                self.app.snapshot.save(self.id, data)
+            self.app.call_from_thread(self.finish_loading, data)
+
+    def finish_loading(self, data):
+        self.stop_loading()
+        self.app.show_timings()
+        # A failed refresh leaves the data on screen, saved or fresh, rather than an error table
+        if not self.is_complete(data) and self.rendered_data is not None and self.is_complete(self.rendered_data):
+            return
+        if data == self.rendered_data:
+            self.set_stale(None)
+            return
+        self.show_data(data)
+
+    def show_data(self, data, stale_since=None):
+        self.set_stale(stale_since)
+        self.render_data(data)
+        self.rendered_data = data
+
+    def set_stale(self, stale_since):
+        self.stale_since = stale_since
+        self.app.mark_stale(self.panel_title, stale_since)
+
+    def stop_loading(self):
+        self.is_loading = False
+        self.app.animation_ticker.discard(self)
+
+    def show_loading(self):
+        self.rendered_data = None
+        spinner = Spinner("point", text=Text(self.loading_message, style=TOKYO_NIGHT["white"]))
+        self.update(Panel(Align.center(spinner, vertical="middle"),
+                          title=self.panel_title,
+                          border_style=self.border_style))
+        self.app.animation_ticker.add(self)
+
+    def on_unmount(self):
+        self.app.animation_ticker.discard(self)
+
+
+class DriverStandingsWidget(LoadableWidget):
+    panel_title = "Driver Standings"
+    border_style = TOKYO_NIGHT["blue"]
+    loading_message = "Fetching driver standings..."
+
+    def fetch_data(self, year):
+        standings = self.f1_data.get_driver_standings(year)
+        return {"year": year, "rows": table_rows(standings, DRIVER_STANDINGS_COLUMNS)}
+
+    def build_table(self):
+        table = Table()
+        table.add_column("Pos", justify="right", style=TOKYO_NIGHT["cyan"])
+        table.add_column("Driver", style=TOKYO_NIGHT["green"])
+        table.add_column("Team", style=TOKYO_NIGHT["yellow"])
+        table.add_column("Points", justify="right", style=TOKYO_NIGHT["magenta"])
+        table.add_column("Wins", justify="right", style=TOKYO_NIGHT["red"])
+        return table
+
+    def table_title(self, data):
+        return f"Driver Standings {data['year']}"
+
+
+class TeamStandingsWidget(LoadableWidget):
+    panel_title = "Constructor Standings"
+    border_style = TOKYO_NIGHT["green"]
+    loading_message = "Fetching team standings..."
+
+    def fetch_data(self, year):
+        standings = self.f1_data.get_team_standings(year)
+        return {"year": year, "rows": table_rows(standings, TEAM_STANDINGS_COLUMNS)}
+
+    def build_table(self):
+        table = Table()
+        table.add_column("Pos", justify="right", style=TOKYO_NIGHT["cyan"])
+        table.add_column("Team", style=TOKYO_NIGHT["green"])
+        table.add_column("Nationality", style=TOKYO_NIGHT["yellow"])
+        table.add_column("Points", justify="right", style=TOKYO_NIGHT["magenta"])
+        table.add_column("Wins", justify="right", style=TOKYO_NIGHT["red"])
+        return table
+
+    def table_title(self, data):
+        return f"Constructor Standings {data['year']}"
+
+
+class RaceScheduleWidget(LoadableWidget):
+    panel_title = "Race Schedule"
+    border_style = TOKYO_NIGHT["yellow"]
+    loading_message = "Fetching race schedule..."
+
+    def fetch_data(self, year):
+        races = self.f1_data.get_race_schedule(year)
+        status_style = races["status"].map(STATUS_STYLES).fillna(TOKYO_NIGHT["blue"])
+        races = races.assign(status="[" + status_style + "]" + races["status"] + "[/]")
+        return {"year": year, "rows": table_rows(races, SCHEDULE_COLUMNS)}
+
+    def build_table(self):
+        table = Table()
+        table.add_column("Round", justify="right", style=TOKYO_NIGHT["cyan"])
+        table.add_column("Grand Prix", style=TOKYO_NIGHT["green"])
+        table.add_column("Circuit", style=TOKYO_NIGHT["yellow"])
+        table.add_column("Date", style=TOKYO_NIGHT["magenta"])
+        table.add_column("Status", style=TOKYO_NIGHT["red"])
+        return table
+
+    def table_title(self, data):
+        return f"Race Schedule {data['year']}"
+
+
+class RaceResultsWidget(LoadableWidget):
+    race_index = reactive(-1, init=False)  # -1 means most recent race
+    panel_title = "Race Results"
+    border_style = TOKYO_NIGHT["red"]
+    loading_message = "Fetching race results..."
+
+    def __init__(self, *args, prefetch_depth=RESULTS_PREFETCH_DEPTH, cache_budget=RESULTS_CACHE_BYTES, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Season and number of completed races as of the last fetch, used for P/N navigation
+        self.current_year = None
+        self.completed_count = None
+        # Fetched results keyed by (year, index into completed races), least recent first
+        self.prefetch_depth = prefetch_depth
+        self.cache_budget = cache_budget
+        self.results_cache = OrderedDict()
+        self.results_cache_size = 0
+
+    def watch_race_index(self, race_index):
+        """React when race_index changes"""
+        # Saved data only covers the most recent race
+        if self.stale_since is not None:
+            self.set_stale(None)
+        key = self.cache_key(race_index)
+        if key in self.results_cache:
+            timing.count("results_cache.hits")
+            # Already fetched; drop any load still running for the previous race
+            self.workers.cancel_group(self, "load")
+            self.stop_loading()
+            self.show_data(self.results_cache[key][0])
+        else:
+            timing.count("results_cache.misses")
+            self.update_content()
+
+    def cache_key(self, race_index):
+        """Resolve a race index, where -1 means the most recent race, to a results cache key"""
+        if self.completed_count is None:
+            return None
+        index = self.completed_count - 1 if race_index == -1 else race_index
+        return self.current_year, index
+
+    def cache_results(self, key, data):
+        """Store fetched results, evicting the least recently used past the budget"""
+        if key in self.results_cache:
+            self.results_cache_size -= self.results_cache.pop(key)[1]
+        size = sum(sys.getsizeof(value) for row in data["rows"] for value in row)
+        self.results_cache[key] = (data, size)
+        self.results_cache_size += size
+        while self.results_cache_size > self.cache_budget and len(self.results_cache) > 1:
+            self.results_cache_size -= self.results_cache.popitem(last=False)[1][1]
+
+    def clear_results_cache(self):
+        self.results_cache.clear()
+        self.results_cache_size = 0
+
+    def previous_race(self):
+        """Navigate to previous race"""
+        # Nothing to navigate until the first fetch has reported the completed races
+        if self.completed_count is None:
+            return
+
+        # From the first race, carry on to the final race of the previous season
+        if self.race_index == 0:
+            self.app.select_season(self.current_year - 1)
+            return
+
+        # If we're showing the most recent race, set to second-to-last race
+        if self.race_index == -1:
+            self.race_index = max(0, self.completed_count - 2)
+        else:
+            # Otherwise just move back one race
+            self.race_index = max(0, self.race_index - 1)
+
+    def next_race(self):
+        """Navigate to next race"""
+        if self.completed_count is None:
+            return
+
+        # From the most recent race, carry on to the first race of the next season
+        if self.race_index == -1:
+            self.app.select_season(self.current_year + 1, race_index=0)
+            return
+
+        # Move to next race, or to -1 to indicate most recent once we reach the last race
+        if self.race_index + 1 >= self.completed_count - 1:
+            self.race_index = -1
+        else:
+            self.race_index += 1
+
+    def fetch_arguments(self):
+        return {"year": self.app.season, "race_index": self.race_index}
+
+    def fetch_data(self, year, race_index):
+        completed_count = len(self.f1_data.get_completed_races(year))
+        if race_index == -1:
+            race_index = completed_count - 1
+        data = self.results_data(year, race_index)
+        data["completed_count"] = completed_count
+        return data
+
+    def show_season(self, race_index):
+        """Open another season on a race without loading the race shown now"""
+        self.set_reactive(RaceResultsWidget.race_index, race_index)
+
+    def results_data(self, year, index):
+        """Rows and race name of one race, indexed into the completed races"""
+        results = self.f1_data.get_race_results(index, year)
+        return {
+            "year": year,
+            "index": index,
+            "race_name": results["race_name"].iloc[0] if not results.empty else "",
+            "rows": table_rows(results, RACE_RESULTS_COLUMNS[:-1])
+        }
+
+    def is_complete(self, data):
+        return super().is_complete(data) and data["rows"][0][0] != "N/A"
+
+    def is_snapshot(self, data):
+        # The panel opens on the most recent race
+        return super().is_snapshot(data) and data["index"] == data["completed_count"] - 1
+
+    @work(thread=True, exclusive=True, group="prefetch")
+    def prefetch_neighbours(self, year, index, completed_count):
+        """Fetch the races around the one on screen so P/N can show them instantly"""
+        worker = get_current_worker()
+        for offset in range(1, self.prefetch_depth + 1):
+            for neighbour in (index - offset, index + offset):
+                if not 0 <= neighbour < completed_count or (year, neighbour) in self.results_cache:
+                    continue
+                # Stop once the user has moved on and a newer prefetch took over
+                if worker.is_cancelled:
+                    return
+                data = self.results_data(year, neighbour)
+                data["completed_count"] = completed_count
+                if self.is_complete(data):
+                    self.app.call_from_thread(self.cache_results, (year, neighbour), data)
+
+    def build_table(self):
+        table = Table()
+        table.add_column("Pos", justify="right", style=TOKYO_NIGHT["cyan"])
+        table.add_column("Driver", style=TOKYO_NIGHT["green"])
+        table.add_column("Team", style=TOKYO_NIGHT["yellow"])
+        table.add_column("Time", style=TOKYO_NIGHT["magenta"])
+        table.add_column("Points", justify="right", style=TOKYO_NIGHT["red"])
+        return table
+
+    def table_title(self, data):
+        return f"Race Results {data['race_name']} {data['year']}"
+
+    def render_data(self, data):
+        self.current_year = data["year"]
+        self.completed_count = data["completed_count"]
+        super().render_data(data)
+
+        # Saved data is revalidated before it is cached or its neighbours are loaded
+        if self.stale_since is None and self.is_complete(data):
+            self.cache_results((data["year"], data["index"]), data)
+            self.prefetch_neighbours(data["year"], data["index"], self.completed_count)
+
+
+class OnDemandWidget(LoadableWidget):
+    """Panel whose data is slow to load, such as the laps of the race selected in the results panel
+
+    Its data takes seconds to load or compute on top of what the other panels show, so it
+    is only fetched while the panel has focus; loads requested meanwhile wait until it gets focus.
+    """
+    # Key focusing the panel and what it loads, for the placeholder shown until then
+    focus_key = ""
+    placeholder_subject = ""
+    # Whether the panel shows the race selected in the results panel
+    follows_race = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Whether a load was requested while the panel did not have focus
+        self.pending = False
+
+    def on_mount(self):
+        super().on_mount()
+        if self.follows_race:
+            self.watch(self.app.query_one(RaceResultsWidget), "race_index", self.race_changed, init=False)
+
+    def race_changed(self, race_index):
+        self.update_content()
+
+    def update_content(self, background=False):
+        if not self.has_focus:
+            self.pending = True
+            # Background refreshes keep the data on screen until the panel gets focus
+            if not background:
+                self.show_placeholder()
+            return
+        self.pending = False
+        super().update_content(background)
+
+    def on_focus(self):
+        # Runs before has_focus is set
+        if self.pending:
+            self.pending = False
+            super().update_content()
+
+    def show_placeholder(self):
+        self.rendered_data = None
+        message = Text(f"Focus this panel ({self.focus_key}) to load {self.placeholder_subject}",
+                       style=TOKYO_NIGHT["white"])
+        self.update(Panel(Align.center(message, vertical="middle"),
+                          title=self.panel_title,
+                          border_style=self.border_style))
+
+    def fetch_arguments(self):
+        return {
+            "year": self.app.season,
+            "race_index": self.app.query_one(RaceResultsWidget).race_index
+        }
+
+    def is_snapshot(self, data):
+        # Loaded on demand, so launches do not paint saved data either
+        return False
+
+
+class LapAnalysisWidget(OnDemandWidget):
+    """Lap times of the race selected in the results panel"""
+    panel_title = "Lap Analysis"
+    border_style = TOKYO_NIGHT["magenta"]
+    loading_message = "Fetching lap times..."
+    focus_key = "5"
+    placeholder_subject = "lap times"
+
+    def on_resize(self, event):
+        # Sparklines are downsampled to the panel width
+        if self.rendered_data is not None and self.has_focus:
+            self.update_content(background=True)
+
+    def fetch_arguments(self):
+        return dict(super().fetch_arguments(), width=max(10, self.size.width - LAP_TABLE_CHROME))
+
+    def fetch_data(self, year, race_index, width):
+        analysis = self.f1_data.get_lap_analysis(race_index, year, width)
+        return {
+            "year": year,
+            "race_name": analysis["race_name"].iloc[0] if not analysis.empty else "",
+            "rows": table_rows(analysis, LAP_ANALYSIS_COLUMNS[:-1])
+        }
+
+    def is_complete(self, data):
+        return super().is_complete(data) and data["rows"][0][0] != "N/A"
+
+    def build_table(self):
+        table = Table(expand=True)
+        table.add_column("Driver", style=TOKYO_NIGHT["green"], no_wrap=True)
+        table.add_column("Fastest", justify="right", style=TOKYO_NIGHT["magenta"], no_wrap=True)
+        table.add_column("Lap", justify="right", style=TOKYO_NIGHT["white"], no_wrap=True)
+        table.add_column("Pace Δ", justify="right", style=TOKYO_NIGHT["yellow"], no_wrap=True)
+        table.add_column("Lap Times", style=TOKYO_NIGHT["cyan"], no_wrap=True, overflow="crop", ratio=1)
+        return table
+
+    def table_title(self, data):
+        return f"Lap Analysis {data['race_name']} {data['year']}"
+
+
+class RaceControlWidget(OnDemandWidget):
+    """Race control messages and track status changes of the race selected in the results panel
+
+    Races have hundreds of messages, so only the rows that fit the panel are turned into
+    table cells; scrolling or jumping to a lap looks the new first row up in the
+    timeline's index and rewrites the visible rows.
+    """
+    panel_title = "Race Control"
+    border_style = TOKYO_NIGHT["yellow"]
+    loading_message = "Fetching race control messages..."
+    focus_key = "6"
+    placeholder_subject = "race control messages"
+
+    BINDINGS = [
+        Binding("up", "scroll_rows(-1)", "Up", show=False),
+        Binding("down", "scroll_rows(1)", "Down", show=False),
+        Binding("pageup", "scroll_page(-1)", "Page Up", show=False),
+        Binding("pagedown", "scroll_page(1)", "Page Down", show=False),
+        Binding("home", "scroll_to_lap(0)", "First Lap", show=False),
+        Binding("end", "scroll_to_end", "Last Lap", show=False),
+        Binding("comma", "previous_lap", "Previous Lap"),
+        Binding("full_stop", "next_lap", "Next Lap"),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Timeline on screen and the index of its first visible row
+        self.timeline = None
+        self.top = 0
+
+    def fetch_data(self, year, race_index):
+        timeline = self.f1_data.get_race_timeline(race_index, year)
+        return {"year": year, "race_name": timeline.race_name, "timeline": timeline}
+
+    def is_complete(self, data):
+        return data["timeline"].status is None
+
+    def build_table(self):
+        table = Table(expand=True)
+        table.add_column("Time", style=TOKYO_NIGHT["cyan"], no_wrap=True)
+        table.add_column("Lap", justify="right", style=TOKYO_NIGHT["white"], no_wrap=True)
+        table.add_column("Type", style=TOKYO_NIGHT["yellow"], no_wrap=True)
+        table.add_column("Message", no_wrap=True, overflow="ellipsis", ratio=1)
+        return table
+
+    def table_title(self, data):
+        title = f"Race Control {data['race_name']} {data['year']}"
+        if self.timeline.last_lap:
+            title += f" | Lap {self.timeline.lap_at(self.top)}/{self.timeline.last_lap}"
+        return title
+
+    def render_data(self, data):
+        timeline = data["timeline"]
+        # A refresh of the race on screen keeps the same moment at the top
+        if self.timeline is not None and self.rendered_data is not None and self.timeline.race_name == timeline.race_name:
+            self.top = timeline.time_row(self.timeline.time_at(self.top))
+        else:
+            self.top = 0
+        self.timeline = timeline
+        self.draw_rows(data)
+
+    def visible_rows(self):
+        return max(1, self.size.height - TIMELINE_CHROME)
+
+    def draw_rows(self, data):
+        """Write the visible slice of the timeline into the table"""
+        with timing.span(f"render.{self.id}"):
+            count = self.visible_rows()
+            self.top = max(0, min(self.top, len(self.timeline) - count))
+            self.table = fill_table(self.build_table(),
+                                    table_rows(self.timeline.rows(self.top, count), RACE_TIMELINE_COLUMNS))
+            self.table.title = self.table_title(data)
+            self.update(self.show_table(self.table))
+
+    def scroll_to(self, row):
+        if self.timeline is not None and self.rendered_data is not None:
+            self.top = row
+            self.draw_rows(self.rendered_data)
+
+    def action_scroll_rows(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def action_scroll_page(self, pages):
+        self.scroll_to(self.top + pages * self.visible_rows())
+
+    def action_scroll_to_lap(self, lap):
+        if self.timeline is not None:
+            self.scroll_to(self.timeline.lap_row(lap))
+
+    def action_scroll_to_end(self):
+        if self.timeline is not None:
+            self.scroll_to(len(self.timeline))
+
+    def action_next_lap(self):
+        if self.timeline is not None:
+            self.action_scroll_to_lap(self.timeline.lap_at(self.top) + 1)
+
+    def action_previous_lap(self):
+        """Go to the start of the lap at the top, or of the previous lap with events when already there"""
+        if self.timeline is None:
+            return
+        row = self.timeline.lap_row(self.timeline.lap_at(self.top))
+        if row >= self.top:
+            row = self.timeline.lap_row(self.timeline.lap_at(max(self.top - 1, 0)))
+        self.scroll_to(row)
+
+    def on_mouse_scroll_down(self, event):
+        self.action_scroll_rows(TIMELINE_SCROLL_ROWS)
+
+    def on_mouse_scroll_up(self, event):
+        self.action_scroll_rows(-TIMELINE_SCROLL_ROWS)
+
+    def on_resize(self, event):
+        # The number of visible rows follows the panel height
+        if self.rendered_data is not None and self.timeline is not None:
+            self.draw_rows(self.rendered_data)
+
+
+class HeadToHeadWidget(OnDemandWidget):
+    """Lap-by-lap gap between two drivers in the race selected in the results panel
+
+    The chart shows the first driver's lead after every lap, above the zero line while
+    ahead, with both drivers' tyre stints underneath. Left and right change the first
+    driver, up and down the second, in finishing order.
+    """
+    panel_title = "Head to Head"
+    border_style = TOKYO_NIGHT["cyan"]
+    loading_message = "Fetching lap times..."
+    focus_key = "7"
+    placeholder_subject = "the comparison"
+
+    BINDINGS = [
+        Binding("left", "change_driver(0, -1)", "Previous Driver", show=False),
+        Binding("right", "change_driver(0, 1)", "Next Driver", show=False),
+        Binding("up", "change_driver(1, -1)", "Previous Rival", show=False),
+        Binding("down", "change_driver(1, 1)", "Next Rival", show=False),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Drivers compared, or None for the race's first two finishers
+        self.pair = [None, None]
+
+    def race_changed(self, race_index):
+        self.pair = [None, None]
+        super().race_changed(race_index)
+
+    def on_resize(self, event):
+        # The gap is downsampled to the panel width
+        if self.rendered_data is not None and self.has_focus:
+            self.update_content(background=True)
+
+    def fetch_arguments(self):
+        return dict(super().fetch_arguments(), first=self.pair[0], second=self.pair[1],
+                    width=max(10, self.size.width - HEAD_TO_HEAD_CHROME))
+
+    def fetch_data(self, year, race_index, first, second, width):
+        return dict(self.f1_data.get_head_to_head(first, second, race_index, year, width), year=year)
+
+    def is_complete(self, data):
+        return data["status"] is None
+
+    def action_change_driver(self, slot, step):
+        data = self.rendered_data
+        if data is None or not self.is_complete(data):
+            return
+        drivers = data["drivers"]
+        pair = [data["first"], data["second"]]
+        index = drivers.index(pair[slot])
+        # Skip the other driver of the pair
+        for _ in range(2):
+            index = (index + step) % len(drivers)
+            if drivers[index] != pair[1 - slot]:
+                break
+        pair[slot] = drivers[index]
+        self.pair = pair
+        self.update_content(background=True)
+
+    def render_data(self, data):
+        with timing.span(f"render.{self.id}"):
+            if not self.is_complete(data):
+                self.update(Panel(Align.center(Text(data["message"], style=TOKYO_NIGHT["white"]), vertical="middle"),
+                                  title=f"{self.panel_title} {data['race_name']} {data['year']}",
+                                  border_style=self.border_style))
+                return
+
+            first, second = data["first"], data["second"]
+            self.pair = [first, second]
+            width = max(10, self.size.width - HEAD_TO_HEAD_CHROME)
+            cell = max(1, width // max(1, len(data["gap"])))
+            lines = []
+            if data["gap"]:
+                height = max(3, self.size.height - HEAD_TO_HEAD_CHROME_ROWS)
+                lines = gap_chart(data["gap"], height, cell, TOKYO_NIGHT["green"], TOKYO_NIGHT["magenta"])
+                span = len(data["gap"]) * cell
+                first_lap, last_lap = str(data["laps"][0]), str(data["laps"][-1])
+                lines.append(Text("lap".rjust(CHART_LABEL_WIDTH - 1) + " " + first_lap
+                                  + last_lap.rjust(max(1, span - len(first_lap))), style=TOKYO_NIGHT["white"]))
+                for driver, compounds in zip((first, second), data["compounds"]):
+                    line = Text(driver.rjust(CHART_LABEL_WIDTH - 1) + " ", style=TOKYO_NIGHT["white"])
+                    for compound in compounds:
+                        line.append("▀" * cell, style=COMPOUND_STYLES.get(compound, TOKYO_NIGHT["bright_black"]))
+                    lines.append(line)
+            legend = Text()
+            legend.append(f"▲ {first} ahead  ", style=TOKYO_NIGHT["green"])
+            legend.append(f"▼ {second} ahead", style=TOKYO_NIGHT["magenta"])
+            lines.append(legend)
+            lines.append(Text(data["final"], style=TOKYO_NIGHT["bright_white"]))
+            self.update(Panel(Group(*lines),
+                              title=f"{self.panel_title} {first} vs {second} {data['race_name']} {data['year']}",
+                              border_style=self.border_style))
+
+
+class ChampionshipWidget(OnDemandWidget):
+    """Points progression and title odds of the drivers or, with t, the teams
+
+    Odds come from simulating the rest of the season many times over, which takes a
+    moment of CPU, so they are computed when the panel gets focus.
+    """
+    panel_title = "Championship"
+    border_style = TOKYO_NIGHT["green"]
+    loading_message = "Simulating the championship..."
+    focus_key = "8"
+    placeholder_subject = "the title odds"
+    follows_race = False
+
+    BINDINGS = [
+        Binding("t", "toggle_table", "Drivers/Teams"),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Table requested and table on screen, drivers or teams
+        self.table_name = "drivers"
+        self.shown_table = None
+
+    def action_toggle_table(self):
+        self.table_name = "teams" if self.table_name == "drivers" else "drivers"
+        self.update_content()
+
+    def fetch_arguments(self):
+        return {"year": self.app.season, "table": self.table_name,
+                "width": max(5, self.size.width - CHAMPIONSHIP_CHROME)}
+
+    def fetch_data(self, year, table, width):
+        championship = self.f1_data.get_championship(table, year, width)
+        return {
+            "year": year,
+            "table": table,
+            "remaining": championship["remaining"].iloc[0] if not championship.empty else "",
+            "rows": table_rows(championship, CHAMPIONSHIP_COLUMNS[:-1])
+        }
+
+    def is_complete(self, data):
+        return super().is_complete(data) and data["rows"][0][0] != "N/A"
+
+    def render_data(self, data):
+        # The name column's heading follows the table shown
+        self.shown_table = data["table"]
+        super().render_data(data)
+
+    def build_table(self):
+        table = Table(expand=True)
+        table.add_column("Pos", justify="right", style=TOKYO_NIGHT["cyan"], no_wrap=True)
+        table.add_column("Driver" if self.shown_table == "drivers" else "Team", style=TOKYO_NIGHT["green"], no_wrap=True)
+        table.add_column("Points", justify="right", style=TOKYO_NIGHT["yellow"], no_wrap=True)
+        table.add_column("Trend", style=TOKYO_NIGHT["blue"], no_wrap=True, overflow="crop", ratio=1)
+        table.add_column("Proj.", justify="right", style=TOKYO_NIGHT["white"], no_wrap=True)
+        table.add_column("Title", justify="right", style=TOKYO_NIGHT["magenta"], no_wrap=True)
+        return table
+
+    def table_title(self, data):
+        title = f"{'Driver' if data['table'] == 'drivers' else 'Constructor'} Championship {data['year']}"
+        if data["remaining"] != "":
+            title += f" | {data['remaining']} rounds left"
+        return title
+
+
+class GlobalLoadingOverlay(Static):
+    """A global overlay for loading state"""
+    DEFAULT_CSS = """
+    GlobalLoadingOverlay {
+        background: rgba(26, 27, 38, 0.8);
+        align: center middle;
+    }
+
+    .spinner-container {
+        background: #1a1b26;
+        border: solid #7aa2f7;
+        width: 50%;
+        height: 15;
+        align: center middle;
+        padding: 1;
+    }
+    """
+
+    def __init__(self, loading_state, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loading_state = loading_state
+        self.loading_state.add_callback(self.on_loading_changed)
+        self.visible = False
+
+    def on_mount(self):
+        self.update_loading(False, "")
+
+    def on_loading_changed(self, is_loading, message):
+        self.update_loading(is_loading, message)
+
+    def update_loading(self, is_loading, message):
+        if is_loading:
+            content = Group(
+                Align.center(Spinner("dots12", text=Text(message, style=TOKYO_NIGHT["bright_white"]))),
+                Align.center(Text("Processing data...", style=TOKYO_NIGHT["bright_white"])),
+                Align.center(Text("This may take a moment", style=TOKYO_NIGHT["white"]))
+            )
+            self.update(content)
+            self.visible = True
+            self.styles.display = "block"
+            self.app.animation_ticker.add(self)
+        else:
+            self.visible = False
+            self.styles.display = "none"
+            self.app.animation_ticker.discard(self)
+
+    def on_unmount(self):
+        self.app.animation_ticker.discard(self)
+
+
+class StatusBar(Static):
+    """Status bar to show application state"""
+    def __init__(self, loading_state, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loading_state = loading_state
+        self.loading_state.add_callback(self.on_loading_changed)
+        # Panels showing saved data from an earlier run, with the time it was saved
+        self.stale_panels = {}
+
+    def on_mount(self):
+        self.update_status(self.loading_state.is_loading, self.loading_state.loading_message)
+
+    def on_loading_changed(self, is_loading, message):
+        self.update_status(is_loading, message)
+
+    def set_stale(self, panel_title, stale_since):
+        if stale_since is None:
+            self.stale_panels.pop(panel_title, None)
+        else:
+            self.stale_panels[panel_title] = stale_since
+        self.update_status(self.loading_state.is_loading, self.loading_state.loading_message)
+
+    def show_timings(self):
+        self.update_status(self.loading_state.is_loading, self.loading_state.loading_message)
+
+    def update_status(self, is_loading, message):
+        if is_loading:
+            status = Text.assemble(
+                ("⟳ ", TOKYO_NIGHT["yellow"]),
+                (message, TOKYO_NIGHT["bright_white"])
+            )
+        else:
+            status = Text.assemble(
+                ("✓ ", TOKYO_NIGHT["green"]),
+                ("Ready", TOKYO_NIGHT["bright_white"])
+            )
+
+        if self.stale_panels:
+            saved_at = min(self.stale_panels.values()).replace("T", " ")[:16]
+            status.append_text(Text.assemble(
+                (" | Saved ", TOKYO_NIGHT["white"]),
+                (saved_at, TOKYO_NIGHT["yellow"]),
+                (": ", TOKYO_NIGHT["white"]),
+                (", ".join(self.stale_panels), TOKYO_NIGHT["yellow"])
+            ))
+
+        # Live timings: the last panel fetch, sessions loaded through fastf1 and cache hits
+        fetch = timing.timings.latest("fetch.")
+        if fetch is not None:
+            session_load = timing.timings.get_span("session.load")
+            hits, misses = timing.timings.cache_counts()
+            status.append_text(Text.assemble(
+                (" | Fetched ", TOKYO_NIGHT["white"]),
+                (datetime.fromtimestamp(fetch["ended_at"]).strftime("%H:%M:%S"), TOKYO_NIGHT["cyan"]),
+                (f" in {fetch['last_s']:.2f}s", TOKYO_NIGHT["white"]),
+                (" | Sessions ", TOKYO_NIGHT["white"]),
+                (str(session_load["calls"] if session_load else 0), TOKYO_NIGHT["cyan"]),
+                (" | Cache hits ", TOKYO_NIGHT["white"]),
+                (f"{hits}/{hits + misses}", TOKYO_NIGHT["cyan"])
+            ))
+
+        status.append_text(Text.assemble(
+            (" | Logs: ", TOKYO_NIGHT["white"]),
+            (log_file, TOKYO_NIGHT["cyan"])
+        ))
+        self.update(status)
+
+
+class RaceNavigationBar(Horizontal):
+    def compose(self):
+        yield Button("← Previous Race (P)", id="prev_race", variant="primary")
+        yield Button("Next Race (N) →", id="next_race", variant="primary")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button presses"""
+        if event.button.id == "prev_race":
+            self.app.query_one(RaceResultsWidget).previous_race()
+        elif event.button.id == "next_race":
+            self.app.query_one(RaceResultsWidget).next_race()
+
+
+class LiveTimingWidget(Static):
+    """Timing tower kept up to date from the live timing feed or a recording
+
+    A worker thread merges each message into a LiveState. A timer capped at
+    LIVE_FRAME_RATE recomputes only the cached rows of drivers that changed since the
+    last frame and rebuilds the table from the cached rows; frames without changes draw
+    nothing.
+    """
+    def __init__(self, replay_path=None, replay_speed=1.0, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replay_path = replay_path
+        self.replay_speed = replay_speed
+        self.state = livetiming.LiveState()
+        # Display cells per driver number, rebuilt when the driver changes
+        self.rows = {}
+        self.table = None
+        self.table_panel = None
+        self.feed_status = "Replay" if replay_path else "Connecting to live timing..."
+
+    def build_table(self):
+        table = Table(expand=True)
+        table.add_column("Pos", justify="right", style=TOKYO_NIGHT["cyan"])
+        table.add_column("Driver", style=TOKYO_NIGHT["green"])
+        table.add_column("Team", style=TOKYO_NIGHT["yellow"])
+        table.add_column("Gap", justify="right", style=TOKYO_NIGHT["magenta"])
+        table.add_column("Int", justify="right", style=TOKYO_NIGHT["magenta"])
+        table.add_column("Last Lap", justify="right", style=TOKYO_NIGHT["white"])
+        table.add_column("Best Lap", justify="right", style=TOKYO_NIGHT["green"])
+        table.add_column("Laps", justify="right", style=TOKYO_NIGHT["white"])
+        table.add_column("Tyre", style=TOKYO_NIGHT["red"])
+        return table
+
+    def on_mount(self):
+        self.table = self.build_table()
+        self.table_panel = Panel(self.table, title="Live Timing", subtitle=self.feed_status,
+                                 border_style=TOKYO_NIGHT["red"])
+        self.update(self.table_panel)
+        self.set_interval(1 / LIVE_FRAME_RATE, self.draw_frame)
+        self.read_feed()
+
+    def on_unmount(self):
+        # Leaving the screen stops the feed, and with it the live timing client
+        self.workers.cancel_group(self, "live")
+
+    @work(thread=True, exclusive=True, group="live")
+    def read_feed(self):
+        worker = get_current_worker()
+        start = time.perf_counter()
+        if self.replay_path:
+            messages = livetiming.replay(self.replay_path, self.replay_speed, lambda: worker.is_cancelled)
+        else:
+            messages = livetiming.follow_live(lambda: worker.is_cancelled)
+        try:
+            for topic, data, _ in messages:
+                self.state.apply(topic, data)
+        except Exception as e:
+            logging.error(f"Error reading live timing: {e}")
+        elapsed = time.perf_counter() - start
+        logging.info(f"Live timing feed ended: {self.state.messages} messages in {elapsed:.2f}s")
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self.finish_feed)
+
+    def finish_feed(self):
+        self.feed_status = "Feed ended"
+        self.draw_frame(force=True)
+
+    def draw_frame(self, force=False):
+        changed, session_changed = self.state.take_changes()
+        if not (changed or session_changed or force):
+            return
+        with timing.span("render.live_panel"):
+            for number in changed:
+                self.rows[number] = self.state.driver_row(number)
+            self.table = fill_table(self.build_table(),
+                                    [self.rows[number] for number in self.state.order() if number in self.rows])
+            self.table_panel.renderable = self.table
+            self.table_panel.title = " | ".join(part for part in ("Live Timing", self.state.title()) if part)
+            if self.replay_path and self.feed_status == "Replay":
+                self.table_panel.subtitle = f"Replay x{self.replay_speed:g} | {self.state.messages} messages"
+            else:
+                self.table_panel.subtitle = f"{self.feed_status} | {self.state.messages} messages"
+            self.update(self.table_panel)
+
+
+class LiveTimingScreen(Screen):
+    """Full-screen live timing, opened over the dashboard"""
+    BINDINGS = [Binding("escape", "app.pop_screen", "Back to Dashboard")]
+
+    def __init__(self, replay_path=None, replay_speed=1.0):
+        super().__init__()
+        self.replay_path = replay_path
+        self.replay_speed = replay_speed
+
+    def compose(self):
+        yield Header(show_clock=True)
+        yield LiveTimingWidget(self.replay_path, self.replay_speed, id="live_panel")
+        yield Footer()
+
+
+class F1DashboardApp(App):
+    BINDINGS = [
+        Binding("q", "quit", "Quit"),
+        Binding("p", "previous_race", "Previous Race"),
+        Binding("n", "next_race", "Next Race"),
+        Binding("left_square_bracket", "previous_season", "Previous Season"),
+        Binding("right_square_bracket", "next_season", "Next Season"),
+        Binding("r", "refresh", "Refresh Data"),
+        Binding("l", "live_timing", "Live Timing"),
+        Binding("1", "focus_drivers", "Driver Standings"),
+        Binding("2", "focus_teams", "Team Standings"),
+        Binding("3", "focus_schedule", "Race Schedule"),
+        Binding("4", "focus_results", "Race Results"),
+        Binding("5", "focus_laps", "Lap Analysis"),
+        Binding("6", "focus_control", "Race Control"),
+        Binding("7", "focus_compare", "Head to Head"),
+        Binding("8", "focus_championship", "Championship"),
+        Binding("tab", "focus_next", "Next Panel", show=False),
+        Binding("shift+tab", "focus_previous", "Previous Panel", show=False),
+    ]
+
+    CSS = f"""
+    Screen {{
+        background: {TOKYO_NIGHT["background"]};
+        color: {TOKYO_NIGHT["foreground"]};
+    }}
+
+    #dashboard {{
+        layout: grid;
+        grid-size: 3 2;
+        grid-gutter: 1 1;
+        height: 90%;
+        margin: 1;
+    }}
+
+    #navigation {{
+        dock: bottom;
+        height: 3;
+        align: center middle;
+        background: {TOKYO_NIGHT["black"]};
+        padding: 1;
+    }}
+
+    #analysis {{
+        row-span: 2;
+        height: 100%;
+    }}
+
+    #laps_panel, #control_panel, #compare_panel, #championship_panel {{
+        height: 100%;
+    }}
+
+    #live_panel {{
+        height: 1fr;
+        margin: 1;
+    }}
+
+    #status_bar {{
+        dock: bottom;
+        height: 1;
+        background: {TOKYO_NIGHT["black"]};
+        color: {TOKYO_NIGHT["bright_white"]};
+        padding: 0 1;
+    }}
+
+    Button {{
+        margin: 0 2;
+        background: {TOKYO_NIGHT["bright_black"]};
+        color: {TOKYO_NIGHT["foreground"]};
+    }}
+
+    Button:hover {{
+        background: {TOKYO_NIGHT["blue"]};
+    }}
+
+    LoadingIndicator {{
+        color: {TOKYO_NIGHT["yellow"]};
+    }}
+
+    .loading-container {{
+        width: 100%;
+        height: 100%;
+        align: center middle;
+        padding: 1;
+    }}
+
+    Static:focus {{
+        border: heavy {TOKYO_NIGHT["accent"]};
+    }}
+
+    Footer {{
+        background: {TOKYO_NIGHT["black"]};
+        color: {TOKYO_NIGHT["foreground"]};
+    }}
+
+    Header {{
+        background: {TOKYO_NIGHT["black"]};
+        color: {TOKYO_NIGHT["foreground"]};
+    }}
+    """
+
+    def __init__(self, *args, f1_data=None, snapshot=None, season=None, replay=None, replay_speed=1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Recorded live timing stream shown by the live timing screen instead of the live feed
+        self.replay = replay
+        self.replay_speed = replay_speed
+        # Season shown by every panel; the dashboard opens on the current one
+        self.default_season = season or datetime.now().year
+        self.season = self.default_season
+        self.sub_title = f"Season {self.season}"
+        # Data the panels showed last time, painted while the first fetch runs
+        self.snapshot = snapshot if snapshot is not None else DashboardSnapshot()
+        self.loading_state = LoadingState()
+        self.loading_state.dispatch = self.call_on_loop
+        self._loop_thread_id = threading.get_ident()
+        # One data service shared by every panel. Unless one is passed in it is created on
+        # first use, which happens in a worker thread, so fastf1 and pandas are imported
+        # after the first frame rather than before it.
+        self._f1_data = f1_data
+        self._f1_data_lock = threading.Lock()
+        # Single timer driving background refreshes of every panel, see schedule_refresh
+        self.refresh_timer = None
+        self.animation_ticker = AnimationTicker(self)
+        if f1_data is not None:
+            f1_data.loading_state = self.loading_state
+
+    @property
+    def f1_data(self):
+        with self._f1_data_lock:
+            if self._f1_data is None:
+                import f1data
+                f1data.initialize_fastf1()
+                self._f1_data = f1data.F1Data()
+                self._f1_data.loading_state = self.loading_state
+            return self._f1_data
+
+    def call_on_loop(self, callback, *args):
+        """Run a callback on the event loop, also when called from a worker thread"""
+        if threading.get_ident() == self._loop_thread_id:
+            callback(*args)
+        else:
+            self.call_from_thread(callback, *args)
+
+    def mark_stale(self, panel_title, stale_since):
+        """Show in the status bar which panels are still on saved data"""
+        for status_bar in self.query(StatusBar):
+            status_bar.set_stale(panel_title, stale_since)
+
+    def show_timings(self):
+        """Bring the live timings in the status bar up to date"""
+        for status_bar in self.query(StatusBar):
+            status_bar.show_timings()
+
+    def compose(self):
+        yield Header(show_clock=True)
+
+        with Container(id="dashboard"):
+            yield DriverStandingsWidget(id="drivers_panel")
+            yield TeamStandingsWidget(id="teams_panel")
+            # Third column, spanning both rows and showing one panel at a time
+            with ContentSwitcher(id="analysis", initial="laps_panel"):
+                yield LapAnalysisWidget(id="laps_panel")
+                yield RaceControlWidget(id="control_panel")
+                yield HeadToHeadWidget(id="compare_panel")
+                yield ChampionshipWidget(id="championship_panel")
+            yield RaceScheduleWidget(id="schedule_panel")
+            yield RaceResultsWidget(id="results_panel")
+
+        yield StatusBar(self.loading_state, id="status_bar")
+
+        with Container(id="navigation"):
+            yield RaceNavigationBar()
+
+        yield Footer()
+
+        # Global loading overlay
+        yield GlobalLoadingOverlay(self.loading_state, id="global_loading")
+
+    def on_mount(self):
+        # Set initial focus
+        self.query_one("#drivers_panel").focus()
+        self.schedule_refresh()
+        self.prune_cache()
+        if self.replay:
+            self.action_live_timing()
+
+    def check_action(self, action, parameters):
+        # The dashboard's own bindings do nothing while live timing covers it
+        if isinstance(self.screen, LiveTimingScreen):
+            return action not in {binding.action for binding in self.BINDINGS} - {"quit"}
+        return True
+
+    @work(thread=True, exclusive=True, group="cache")
+    def prune_cache(self):
+        """Bring the fastf1 cache back under its budget, oldest sessions first"""
+        try:
+            self.f1_data.prune_cache()
+        except OSError as e:
+            logging.error(f"Error pruning the fastf1 cache: {e}")
+
+    @work(thread=True, exclusive=True, group="schedule")
+    def schedule_refresh(self):
+        """Plan the next background refresh from the event schedule"""
+        delay = self.f1_data.refresh_delay(self.season)
+        self.call_from_thread(self.set_refresh_timer, delay)
+
+    def set_refresh_timer(self, delay):
+        if self.refresh_timer is not None:
+            self.refresh_timer.stop()
+        # Closed seasons are only refreshed on request
+        self.refresh_timer = None if delay is None else self.set_timer(delay, self.refresh_panels)
+
+    def refresh_panels(self):
+        self.refresh_timer = None
+        for panel in self.query(LoadableWidget):
+            panel.update_content(background=True)
+        self.schedule_refresh()
+
+    def select_season(self, year, race_index=-1):
+        """Show another season in every panel, opening its results on race_index"""
+        if not FIRST_SEASON <= year <= self.default_season or year == self.season:
+            return
+        self.season = year
+        self.sub_title = f"Season {year}"
+        self.query_one(RaceResultsWidget).show_season(race_index)
+        for panel in self.query(LoadableWidget):
+            panel.set_stale(None)
+            panel.update_content()
+        self.schedule_refresh()
+        # Index the season before this one meanwhile, so paging back is a lookup
+        self.index_season(year - 1)
+
+    @work(thread=True, exclusive=True, group="index")
+    def index_season(self, year):
+        """Store a season's schedule and results in the season index, resuming where it stopped"""
+        if year < FIRST_SEASON:
+            return
+        try:
+            self.f1_data.get_season_aggregate(year)
+        except Exception as e:
+            logging.error(f"Error indexing the {year} season: {e}")
+
+    def action_previous_season(self):
+        self.select_season(self.season - 1)
+
+    def action_next_season(self):
+        self.select_season(self.season + 1)
+
+    def action_previous_race(self):
+        """Handle keyboard shortcut for previous race"""
+        self.query_one(RaceResultsWidget).previous_race()
+
+    def action_next_race(self):
+        """Handle keyboard shortcut for next race"""
+        self.query_one(RaceResultsWidget).next_race()
+
+    def action_refresh(self):
+        """Refresh all data"""
+        if self._f1_data is not None:
+            self._f1_data.invalidate()
+        # Results of a race that had not settled may have changed since they were fetched
+        self.query_one(RaceResultsWidget).clear_results_cache()
+        for panel in self.query(LoadableWidget):
+            panel.update_content()
+        self.schedule_refresh()
+
+    def action_live_timing(self):
+        """Open live timing over the dashboard"""
+        self.push_screen(LiveTimingScreen(self.replay, self.replay_speed))
+
+    def action_focus_drivers(self):
+        """Focus driver standings panel"""
+        self.query_one("#drivers_panel").focus()
+
+    def action_focus_teams(self):
+        """Focus team standings panel"""
+        self.query_one("#teams_panel").focus()
+
+    def action_focus_schedule(self):
+        """Focus race schedule panel"""
+        self.query_one("#schedule_panel").focus()
+
+    def action_focus_results(self):
+        """Focus race results panel"""
+        self.query_one("#results_panel").focus()
+
+    def action_focus_laps(self):
+        """Focus lap analysis panel"""
+        self.focus_panel("#laps_panel")
+
+    def action_focus_control(self):
+        """Focus race control panel"""
+        self.focus_panel("#control_panel")
+
+    def action_focus_compare(self):
+        """Focus head-to-head panel"""
+        self.focus_panel("#compare_panel")
+
+    def action_focus_championship(self):
+        """Focus championship panel"""
+        self.focus_panel("#championship_panel")
+
+    def focus_panel(self, selector):
+        """Focus a panel, first showing it if it shares the third column with another one"""
+        panel = self.query_one(selector)
+        analysis = self.query_one("#analysis", ContentSwitcher)
+        if panel.parent is analysis:
+            analysis.current = panel.id
+        panel.focus()
+
+    def action_focus_next(self):
+        """Focus next panel in sequence"""
+        self.cycle_focus(1)
+
+    def action_focus_previous(self):
+        """Focus previous panel in sequence"""
+        self.cycle_focus(-1)
+
+    def cycle_focus(self, step):
+        focused = self.focused
+        if focused and focused.id in PANEL_ORDER:
+            next_index = (PANEL_ORDER.index(focused.id) + step) % len(PANEL_ORDER)
+            self.focus_panel(f"#{PANEL_ORDER[next_index]}")
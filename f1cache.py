@@ -0,0 +1,192 @@
+"""Size-bounded management of the fastf1 cache.
+
+fastf1 keeps everything it downloads under ``<cache>/<year>/<event>/<session>`` and
+never removes any of it. Reading results only needs a session's session and driver
+info, so pruning first drops the other, much larger artifacts of the least recently
+used sessions, and only then whole sessions, until the cached sessions fit the budget.
+
+Only the standard library is imported here, so the ``lazyf1 cache`` commands run
+without fastf1 or pandas.
+"""
+
+import os
+import shutil
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+
+from common import cache_dir, cache_usage_file
+
+# Bytes the cached sessions are pruned down to; fastf1's HTTP cache is not counted since
+# pruning never shrinks it
+CACHE_BUDGET_BYTES = 1024 ** 3
+
+# Artifacts a results-only session load reads; every other artifact of a session is heavy
+RESULTS_ARTIFACTS = frozenset(["session_info.ff1pkl", "driver_info.ff1pkl"])
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def scan(path=cache_dir):
+    """List the cached sessions, least recently used first
+
+    Each session is a dict with its season, directory, last use time and the bytes
+    taken by results artifacts and by heavy artifacts.
+    """
+    sessions = []
+    for year_entry in os.scandir(path) if os.path.isdir(path) else ():
+        if not (year_entry.is_dir() and year_entry.name.isdigit()):
+            continue
+        for event_entry in os.scandir(year_entry.path):
+            if not event_entry.is_dir():
+                continue
+            for session_entry in os.scandir(event_entry.path):
+                if not session_entry.is_dir():
+                    continue
+                session = {
+                    "year": int(year_entry.name),
+                    "path": session_entry.path,
+                    "last_used": session_entry.stat().st_mtime,
+                    "results_bytes": 0,
+                    "heavy_bytes": 0
+                }
+                for file_entry in os.scandir(session_entry.path):
+                    if file_entry.is_file():
+                        kind = "results_bytes" if file_entry.name in RESULTS_ARTIFACTS else "heavy_bytes"
+                        session[kind] += file_entry.stat().st_size
+                sessions.append(session)
+    sessions.sort(key=lambda session: session["last_used"])
+    return sessions
+
+
+def cache_size(path=cache_dir):
+    """Total bytes under the cache directory, including fastf1's HTTP cache"""
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(_file_size(os.path.join(root, name)) for name in files)
+    return total
+
+
+def prune(budget=CACHE_BUDGET_BYTES, path=cache_dir, keep_years=()):
+    """Remove cached sessions, least recently used first, until they fit the budget
+
+    Heavy artifacts are dropped from every session before any session is removed
+    outright. Only session artifacts count towards the budget, so a large HTTP cache
+    does not empty the session cache. Sessions of the seasons in keep_years count
+    towards the budget but are left whole, so the cache can stay above it. Returns the
+    session bytes left, the bytes freed and the number of sessions trimmed and removed.
+    """
+    sessions = scan(path)
+    size = sum(session["results_bytes"] + session["heavy_bytes"] for session in sessions)
+    sessions = [session for session in sessions if session["year"] not in keep_years]
+    report = {"size_bytes": size, "freed_bytes": 0, "trimmed_sessions": 0, "removed_sessions": 0}
+    if size <= budget:
+        return report
+
+    for session in sessions:
+        if size <= budget:
+            break
+        if not session["heavy_bytes"]:
+            continue
+        for file_entry in os.scandir(session["path"]):
+            if file_entry.is_file() and file_entry.name not in RESULTS_ARTIFACTS:
+                _remove(file_entry.path)
+        size -= session["heavy_bytes"]
+        report["freed_bytes"] += session["heavy_bytes"]
+        report["trimmed_sessions"] += 1
+
+    for session in sessions:
+        if size <= budget:
+            break
+        shutil.rmtree(session["path"], ignore_errors=True)
+        size -= session["results_bytes"]
+        report["freed_bytes"] += session["results_bytes"]
+        report["removed_sessions"] += 1
+        # Drop the event directory once its last session is gone
+        event_dir = os.path.dirname(session["path"])
+        if not os.listdir(event_dir):
+            os.rmdir(event_dir)
+
+    report["size_bytes"] = size
+    logging.info(f"Pruned {report['freed_bytes']} bytes from the fastf1 cache: {report}")
+    return report
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        logging.error(f"Error removing {path} from the fastf1 cache: {e}")
+
+
+def stats(path=cache_dir, usage=None):
+    """Per-season size and hit rate of the cache, keyed by season"""
+    usage = (usage or cache_usage).load()
+    seasons = {}
+    for session in scan(path):
+        season = seasons.setdefault(session["year"], {"sessions": 0, "size_bytes": 0, "heavy_bytes": 0})
+        season["sessions"] += 1
+        season["size_bytes"] += session["results_bytes"] + session["heavy_bytes"]
+        season["heavy_bytes"] += session["heavy_bytes"]
+    for year in set(seasons) | set(usage):
+        season = seasons.setdefault(year, {"sessions": 0, "size_bytes": 0, "heavy_bytes": 0})
+        hits, misses = usage.get(year, (0, 0))
+        season.update(hits=hits, misses=misses, hit_rate=hits / (hits + misses) if hits + misses else None)
+    return dict(sorted(seasons.items()))
+
+
+def touch(session_path):
+    """Mark a cached session as used, for least recently used pruning"""
+    try:
+        os.utime(session_path)
+    except OSError:
+        pass
+
+
+class CacheUsage:
+    """Persisted per-season counts of session loads served from the cache or downloaded"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE IF NOT EXISTS usage (year INTEGER PRIMARY KEY, hits INTEGER, misses INTEGER)")
+        return conn
+
+    def record(self, year, hit):
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT INTO usage VALUES (?, ?, ?) ON CONFLICT (year) DO UPDATE SET "
+                    "hits = hits + excluded.hits, misses = misses + excluded.misses",
+                    (year, int(hit), int(not hit))
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Error recording fastf1 cache usage: {e}")
+
+    def load(self):
+        """Return (hits, misses) keyed by season"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with closing(self._connect()) as conn:
+                return {year: (hits, misses) for year, hits, misses in conn.execute("SELECT * FROM usage")}
+        except sqlite3.Error as e:
+            logging.error(f"Error reading fastf1 cache usage: {e}")
+            return {}
+
+
+cache_usage = CacheUsage(cache_usage_file)
+
+
+def record_load(year, session_path, hit):
+    """Count a session load against its season and mark the session as used"""
+    cache_usage.record(year, hit)
+    touch(session_path)
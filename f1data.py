@@ -0,0 +1,1626 @@
+"""Data layer: loads schedules and session results through fastf1.
+
+Importing this module imports fastf1 and pandas, which dominates startup time, so
+the dashboard only imports it from a worker thread once the first panel needs data.
+"""
+
+import os
+import json
+import shutil
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import fastf1
+import numpy as np
+import pandas as pd
+
+import f1cache
+import timing
+from common import (
+    CHAMPIONSHIP_COLUMNS, DRIVER_STANDINGS_COLUMNS, LAP_ANALYSIS_COLUMNS, RACE_RESULTS_COLUMNS, RACE_TIMELINE_COLUMNS,
+    SCHEDULE_COLUMNS, TEAM_STANDINGS_COLUMNS, LoadingState, RequestCoalescer, cache_dir, ledger_file,
+    redirect_fastf1_logs, store_dir
+)
+
+# Number of sessions loaded concurrently when aggregating a season; every standings
+# session of the season shares the pool, so it grows with the cores available
+DEFAULT_LOAD_WORKERS = max(4, os.cpu_count() or 1)
+
+# Rounds are only persisted to the results ledger once their results have had time to settle
+LEDGER_SETTLE_TIME = pd.Timedelta(days=1)
+
+# How long a fetched event schedule is reused, and how many seasons are kept in memory
+SCHEDULE_TTL = 3600
+SCHEDULE_CACHE_SEASONS = 4
+
+# Refresh cadence: often while the results of a session that just ended come in, rarely
+# between race weekends. Session end times are estimated from their scheduled start.
+SESSION_DURATION = pd.Timedelta(hours=2)
+RESULTS_WINDOW = pd.Timedelta(hours=3)
+RESULTS_POLL_INTERVAL = 120
+IDLE_POLL_INTERVAL = 6 * 3600
+
+# Session.load options for reading results only. Session info, driver info and results are
+# still loaded, but laps, race control messages and the large timing streams are skipped.
+RESULTS_ONLY_LOAD = {"laps": False, "telemetry": False, "weather": False, "messages": False}
+
+# Session types whose points count towards the standings, merged per round in this order
+STANDINGS_SESSIONS = ("R", "S")
+
+# Event formats holding a session type; types missing here are held at every event
+SESSION_FORMATS = {"S": frozenset(["sprint", "sprint_shootout", "sprint_qualifying"])}
+
+# Session.load options for lap analysis: laps, without telemetry, weather or race control messages
+LAPS_LOAD = {"laps": True, "telemetry": False, "weather": False, "messages": False}
+
+# Lap columns kept from a loaded session
+LAP_COLUMNS = ['Driver', 'DriverNumber', 'Team', 'LapNumber', 'LapTime', 'Time', 'Stint', 'Compound',
+               'PitInTime', 'PitOutTime', 'Position']
+
+# Number of sessions whose laps are kept in memory
+LAPS_CACHE_SESSIONS = 4
+
+# Number of driver pairs whose head-to-head comparisons are kept in memory
+HEAD_TO_HEAD_CACHE_PAIRS = 32
+
+# Session.load options for the race control timeline: messages, and laps to place track status
+# changes on the lap they happened
+TIMELINE_LOAD = {"laps": True, "telemetry": False, "weather": False, "messages": True}
+
+# Number of sessions whose timelines are kept in memory
+TIMELINE_CACHE_SESSIONS = 4
+
+# Race control message categories as shown in the timeline; flag messages show the flag instead
+RACE_CONTROL_CATEGORIES = {"SafetyCar": "Safety car", "CarEvent": "Car event", "Drs": "DRS"}
+
+# Track status codes as shown in the timeline
+TRACK_STATUS_MESSAGES = {
+    "1": "Track clear",
+    "2": "Yellow flag",
+    "4": "Safety car deployed",
+    "5": "Red flag",
+    "6": "Virtual safety car deployed",
+    "7": "Virtual safety car ending"
+}
+
+# Sparkline levels; laps slower than this quantile of the race's lap times are drawn full height,
+# so safety car and pit laps do not flatten the rest
+SPARKLINE_BLOCKS = np.array(list("▁▂▃▄▅▆▇█"))
+SPARKLINE_QUANTILE = 0.9
+
+# Points for the top ten of a Grand Prix
+RACE_POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+
+# Points for the top eight of a sprint
+SPRINT_POINTS = (8, 7, 6, 5, 4, 3, 2, 1)
+
+# Points per position of each standings session type, for the sessions still to run
+SESSION_POINTS = {"R": RACE_POINTS, "S": SPRINT_POINTS}
+
+# Simulated seasons behind the title odds, and simulated race outcomes drawn per points system
+# that each simulated season picks its races from
+TITLE_ODDS_RUNS = 100_000
+TITLE_ODDS_POOL = 1 << 14
+
+# Points added to every driver's average per race when drawing finishing orders, so drivers
+# without points yet still finish in the points now and then
+TITLE_ODDS_PRIOR_POINTS = 1.0
+
+# Season aggregates shared by all F1Data instances, keyed by (year, completed rounds)
+_season_aggregates = {}
+
+# Championship projections, keyed by (year, completed rounds, remaining sessions, runs)
+_projections = {}
+
+# Guards both of the above, which panel fetches, season indexing and invalidation all update
+_memo_lock = threading.Lock()
+
+
+# Cache directory fastf1 was pointed at, handed to worker processes
+_fastf1_cache_dir = None
+
+
+def initialize_fastf1(path=None):
+    """Route FastF1 logs to the log file and enable its cache"""
+    global _fastf1_cache_dir
+    redirect_fastf1_logs()
+    _fastf1_cache_dir = path or cache_dir
+    fastf1.Cache.enable_cache(_fastf1_cache_dir)
+
+
+def refresh_delay(schedule, now):
+    """Seconds until a season's data may next change, or None once the season is closed
+
+    ``now`` is a naive UTC timestamp, compared against the sessions' UTC start times.
+    """
+    columns = [column for column in schedule.columns if column.startswith("Session") and column.endswith("DateUtc")]
+    session_ends = pd.to_datetime(schedule[columns].stack(), errors="coerce").dropna() + SESSION_DURATION
+    if session_ends.empty:
+        return IDLE_POLL_INTERVAL
+
+    if ((session_ends <= now) & (session_ends > now - RESULTS_WINDOW)).any():
+        return RESULTS_POLL_INTERVAL
+
+    upcoming = session_ends[session_ends > now]
+    if not upcoming.empty:
+        until_next = (upcoming.min() - now).total_seconds()
+        return int(max(RESULTS_POLL_INTERVAL, min(IDLE_POLL_INTERVAL, until_next)))
+
+    # Results may still be amended for a while after the final session
+    if session_ends.max() + LEDGER_SETTLE_TIME > now:
+        return IDLE_POLL_INTERVAL
+    return None
+
+
+def _season_closed(schedule):
+    """Whether every event of a season is over and its results have settled"""
+    return not schedule.empty and schedule['EventDate'].max() + LEDGER_SETTLE_TIME < pd.Timestamp(datetime.now())
+
+
+class ScheduleCache:
+    """In-memory event schedules per season with a TTL and LRU eviction across seasons"""
+    def __init__(self, ttl=SCHEDULE_TTL, max_seasons=SCHEDULE_CACHE_SEASONS):
+        self.ttl = ttl
+        self.max_seasons = max_seasons
+        self._schedules = OrderedDict()
+        self._lock = threading.Lock()
+        self._coalescer = RequestCoalescer()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, year):
+        """Return the event schedule for a season, fetching it when missing or expired"""
+        with self._lock:
+            entry = self._schedules.get(year)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._schedules.move_to_end(year)
+                self.hits += 1
+                timing.count("schedule_cache.hits")
+                return entry[1]
+            self.misses += 1
+        timing.count("schedule_cache.misses")
+
+        return self._coalescer.run(year, self._fetch, year)
+
+    @property
+    def coalesced(self):
+        return self._coalescer.coalesced
+
+    def _fetch(self, year):
+        # Closed seasons come from the season index; others, and schedules stored without
+        # event formats, are fetched, falling back to the stored schedule when fastf1 cannot be reached
+        schedule = results_ledger.load_schedule(year)
+        if schedule is None or not _season_closed(schedule) or schedule['EventFormat'].isna().any():
+            try:
+                with timing.span("schedule.fetch", year):
+                    fetched = fastf1.get_event_schedule(year)
+            except Exception as e:
+                if schedule is None:
+                    raise
+                logging.error(f"Error fetching the {year} schedule, using the stored one: {e}")
+            else:
+                schedule = fetched
+                if not schedule.empty:
+                    results_ledger.store_schedule(year, schedule)
+
+        with self._lock:
+            self._schedules[year] = (time.monotonic(), schedule)
+            self._schedules.move_to_end(year)
+            while len(self._schedules) > self.max_seasons:
+                self._schedules.popitem(last=False)
+        return schedule
+
+    def cached(self, year):
+        """The schedule kept for a season, expired or not, without fetching it; None if missing"""
+        with self._lock:
+            entry = self._schedules.get(year)
+        return None if entry is None else entry[1]
+
+    def invalidate(self, year=None):
+        """Drop the cached schedule for one season, or for all seasons"""
+        with self._lock:
+            if year is None:
+                self._schedules.clear()
+            else:
+                self._schedules.pop(year, None)
+
+
+schedule_cache = ScheduleCache()
+
+
+class SessionCache:
+    """In-memory per-session values, keyed by (year, round, session type) or finer, with LRU eviction
+
+    Hits and misses are counted under the given counter name. With skip_empty, empty
+    values are not kept: a session whose data has not been published yet loads empty, and
+    is loaded again on the next request.
+    """
+    def __init__(self, name, max_sessions, skip_empty=False):
+        self.name = name
+        self.max_sessions = max_sessions
+        self.skip_empty = skip_empty
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value kept for a session, or None"""
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                timing.count(f"{self.name}.hits")
+                return self._values[key]
+        timing.count(f"{self.name}.misses")
+        return None
+
+    def put(self, key, value):
+        if self.skip_empty and not len(value):
+            return
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_sessions:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def discard(self, predicate):
+        """Drop the values whose key the predicate accepts"""
+        with self._lock:
+            for key in [key for key in self._values if predicate(key)]:
+                del self._values[key]
+
+
+# Laps and timelines of recently viewed sessions, and head-to-head comparisons keyed by
+# (year, round, first driver, second driver)
+_session_laps = SessionCache("laps_cache", LAPS_CACHE_SESSIONS, skip_empty=True)
+_session_timelines = SessionCache("timeline_cache", TIMELINE_CACHE_SESSIONS, skip_empty=True)
+_head_to_heads = SessionCache("head_to_head_cache", HEAD_TO_HEAD_CACHE_PAIRS)
+
+
+class ColumnStore:
+    """Tables kept as one NumPy file per column and read back memory-mapped
+
+    Numbers, dates and durations are mapped straight from disk without decoding, so a
+    read only pages in the columns and rows it touches; strings are stored fixed-width.
+    Each table lives in its own directory, keyed by a tuple such as (year, 'R').
+    """
+    def __init__(self, path):
+        self.path = path
+        # Serializes swapping a written table into place
+        self._lock = threading.Lock()
+
+    def _directory(self, key):
+        return os.path.join(self.path, *map(str, key))
+
+    def read(self, key):
+        """Return the table stored under key, or None"""
+        directory = self._directory(key)
+        try:
+            with open(os.path.join(directory, "columns.json"), encoding="utf-8") as f:
+                columns = json.load(f)
+            arrays = {
+                column: np.load(os.path.join(directory, f"{index}.npy"), mmap_mode='r')
+                for index, column in enumerate(columns)
+            }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(f"Error reading {directory} from the column store: {e}")
+            return None
+        return pd.DataFrame(arrays, copy=False)
+
+    def write(self, key, frame):
+        """Store a table under key, replacing the directory atomically"""
+        directory = self._directory(key)
+        temp_directory = None
+        try:
+            parent, name = os.path.split(directory)
+            os.makedirs(parent, exist_ok=True)
+            # Each write stages in a directory of its own, so concurrent writers of a key do not mix
+            temp_directory = tempfile.mkdtemp(prefix=f"{name}.", suffix=".tmp", dir=parent)
+            for index, column in enumerate(frame.columns):
+                values = frame[column]
+                if values.dtype == object:
+                    values = values.fillna("").astype(str).to_numpy(dtype=str)
+                else:
+                    values = values.to_numpy()
+                np.save(os.path.join(temp_directory, f"{index}.npy"), values, allow_pickle=False)
+            with open(os.path.join(temp_directory, "columns.json"), "w", encoding="utf-8") as f:
+                json.dump(list(frame.columns), f)
+            with self._lock:
+                self.remove(key)
+                try:
+                    os.rename(temp_directory, directory)
+                except OSError:
+                    # Another process wrote the same table in between
+                    if not os.path.isdir(directory):
+                        raise
+        except (OSError, ValueError) as e:
+            logging.error(f"Error writing {directory} to the column store: {e}")
+        finally:
+            if temp_directory is not None:
+                shutil.rmtree(temp_directory, ignore_errors=True)
+
+    def remove(self, key):
+        shutil.rmtree(self._directory(key), ignore_errors=True)
+
+
+class ResultsLedger:
+    """Persisted per-season index of event schedules and per-round session results
+
+    Finished rounds are only loaded once, and the schedules of closed seasons are never
+    fetched again, so browsing past seasons reads from here instead of fastf1.
+    """
+    # Results columns kept for each driver; Time is stored in seconds
+    COLUMNS = ['DriverNumber', 'FirstName', 'LastName', 'TeamName', 'Position', 'Points', 'Status', 'Time']
+    # Event schedule columns kept for each season
+    SCHEDULE_COLUMNS = ['RoundNumber', 'EventName', 'Location', 'Country', 'EventDate'] + [
+        f'Session{n}DateUtc' for n in range(1, 6)
+    ] + ['EventFormat']
+    SCHEDULE_DATES = SCHEDULE_COLUMNS[4:10]
+
+    def __init__(self, path, store_path=None):
+        self.path = path
+        # Columnar copies of stored seasons, rewritten lazily after the ledger changes
+        self.store = ColumnStore(store_path) if store_path else None
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        if not self._initialized:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rounds (
+                    year INTEGER, round INTEGER, session TEXT, stored_at TEXT,
+                    PRIMARY KEY (year, round, session)
+                );
+                CREATE TABLE IF NOT EXISTS results (
+                    year INTEGER, round INTEGER, session TEXT,
+                    driver_number TEXT, first_name TEXT, last_name TEXT, team TEXT,
+                    position REAL, points REAL, status TEXT, time REAL,
+                    PRIMARY KEY (year, round, session, driver_number)
+                );
+                CREATE TABLE IF NOT EXISTS schedules (
+                    year INTEGER PRIMARY KEY, stored_at TEXT
+                );
+                CREATE TABLE IF NOT EXISTS events (
+                    year INTEGER, round INTEGER, name TEXT, location TEXT, country TEXT, event_date TEXT,
+                    session1_utc TEXT, session2_utc TEXT, session3_utc TEXT, session4_utc TEXT, session5_utc TEXT,
+                    event_format TEXT
+                );
+            """)
+            # Ledgers created before event formats were kept get the column added
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(events)")]
+            if "event_format" not in columns:
+                conn.execute("ALTER TABLE events ADD COLUMN event_format TEXT")
+            self._initialized = True
+        return conn
+
+    def load_rounds(self, year, rounds, session_type='R'):
+        """Return the stored results for the given rounds, keyed by round number"""
+        season = self.load_season(year, session_type)
+        if season is None:
+            return {}
+
+        round_numbers = season['RoundNumber'].to_numpy()
+        wanted = sorted(set(np.unique(round_numbers).tolist()).intersection(rounds))
+        starts = np.searchsorted(round_numbers, wanted, side='left')
+        ends = np.searchsorted(round_numbers, wanted, side='right')
+        results = season[self.COLUMNS].set_index('DriverNumber', drop=False)
+        return {
+            round_number: results.iloc[start:end]
+            for round_number, start, end in zip(wanted, starts, ends)
+        }
+
+    def load_season(self, year, session_type='R'):
+        """Return every stored result of a season with its RoundNumber, sorted by round, or None
+
+        Reads come from the columnar store; a season missing there is read from SQLite
+        once and written to the store for the next read.
+        """
+        key = (year, session_type)
+        if self.store is not None:
+            season = self.store.read(key)
+            if season is not None:
+                return season
+
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT round, driver_number, first_name, last_name, team, position, points, status, time "
+                    "FROM results WHERE year = ? AND session = ? ORDER BY round, rowid",
+                    (year, session_type)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading results ledger: {e}")
+            return None
+        if not rows:
+            return None
+
+        season = pd.DataFrame(rows, columns=['RoundNumber'] + self.COLUMNS)
+        season['Time'] = pd.to_timedelta(season['Time'], unit='s')
+        if self.store is not None:
+            self.store.write(key, season)
+        return season
+
+    def store_round(self, year, round_number, session_type, results):
+        """Persist the results of a finished round, replacing anything stored before"""
+        results = results.reindex(columns=self.COLUMNS)
+        rows = [
+            (year, round_number, session_type,
+             str(row.DriverNumber), row.FirstName, row.LastName, row.TeamName,
+             None if pd.isna(row.Position) else float(row.Position),
+             None if pd.isna(row.Points) else float(row.Points),
+             None if pd.isna(row.Status) else row.Status,
+             None if pd.isna(row.Time) else row.Time.total_seconds())
+            for row in results.itertuples(index=False)
+        ]
+        if self.store is not None:
+            self.store.remove((year, session_type))
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM results WHERE year = ? AND round = ? AND session = ?",
+                             (year, round_number, session_type))
+                conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.execute("INSERT OR REPLACE INTO rounds VALUES (?, ?, ?, ?)",
+                             (year, round_number, session_type, datetime.now().isoformat()))
+        except sqlite3.Error as e:
+            logging.error(f"Error writing round {round_number} of {year} to results ledger: {e}")
+
+    def load_schedule(self, year):
+        """Return the stored event schedule of a season, or None if it has not been stored"""
+        key = (year, "schedule")
+        if self.store is not None:
+            schedule = self.store.read(key)
+            # Schedules stored before a column was added are read from SQLite again
+            if schedule is not None and list(schedule.columns) == self.SCHEDULE_COLUMNS:
+                return schedule
+
+        try:
+            with closing(self._connect()) as conn:
+                if conn.execute("SELECT 1 FROM schedules WHERE year = ?", (year,)).fetchone() is None:
+                    return None
+                rows = conn.execute(
+                    "SELECT round, name, location, country, event_date, session1_utc, session2_utc, "
+                    "session3_utc, session4_utc, session5_utc, event_format FROM events WHERE year = ? ORDER BY rowid",
+                    (year,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading results ledger: {e}")
+            return None
+        schedule = pd.DataFrame(rows, columns=self.SCHEDULE_COLUMNS)
+        schedule[self.SCHEDULE_DATES] = schedule[self.SCHEDULE_DATES].apply(pd.to_datetime)
+        if self.store is not None:
+            self.store.write(key, schedule)
+        return schedule
+
+    def store_schedule(self, year, schedule):
+        """Persist a season's event schedule, replacing anything stored before"""
+        schedule = schedule.reindex(columns=self.SCHEDULE_COLUMNS)
+        schedule[self.SCHEDULE_DATES] = schedule[self.SCHEDULE_DATES].apply(
+            lambda column: pd.to_datetime(column).dt.strftime("%Y-%m-%dT%H:%M:%S")
+        )
+        rows = [
+            (year, int(row[0])) + tuple(None if pd.isna(value) else value for value in row[1:])
+            for row in schedule.itertuples(index=False, name=None)
+        ]
+        if self.store is not None:
+            self.store.remove((year, "schedule"))
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM events WHERE year = ?", (year,))
+                conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.execute("INSERT OR REPLACE INTO schedules VALUES (?, ?)", (year, datetime.now().isoformat()))
+        except sqlite3.Error as e:
+            logging.error(f"Error writing the {year} schedule to results ledger: {e}")
+
+    def load_laps(self, year, round_number, session_type='R'):
+        """Return the stored laps of a session, or None; laps are only kept in the column store"""
+        if self.store is None:
+            return None
+        laps = self.store.read((year, "laps", session_type, round_number))
+        # Laps stored before a column was added are loaded again
+        if laps is not None and list(laps.columns) != LAP_COLUMNS:
+            return None
+        return laps
+
+    def store_laps(self, year, round_number, session_type, laps):
+        if self.store is not None:
+            self.store.write((year, "laps", session_type, round_number), laps)
+
+    def load_timeline(self, year, round_number, session_type='R'):
+        """Return the stored timeline events of a session, or None; like laps they are only kept in the column store"""
+        if self.store is None:
+            return None
+        return self.store.read((year, "timeline", session_type, round_number))
+
+    def store_timeline(self, year, round_number, session_type, events):
+        if self.store is not None:
+            self.store.write((year, "timeline", session_type, round_number), events)
+
+
+results_ledger = ResultsLedger(ledger_file, store_dir)
+
+
+def _load_session(year, round_number, session_type, options, artifact):
+    """Load a session with the given Session.load options, counting a fastf1 cache hit
+    when the artifact the load needs most is already cached"""
+    session = fastf1.get_session(year, round_number, session_type)
+    session_path = None
+    if _fastf1_cache_dir and session.api_path:
+        # fastf1 drops the leading /static/ of the API path for its cache directories
+        session_path = os.path.join(_fastf1_cache_dir, session.api_path[8:])
+    hit = session_path is not None and os.path.exists(os.path.join(session_path, artifact))
+    with timing.span("session.load", f"{year} round {round_number} {session_type}"):
+        session.load(**options)
+    if session_path is not None:
+        f1cache.record_load(year, session_path, hit)
+        timing.count("fastf1_cache.hits" if hit else "fastf1_cache.misses")
+    return session
+
+
+def _load_round_results(year, round_number, session_type):
+    """Load a single session in results-only mode and return a plain copy of its results"""
+    session = _load_session(year, round_number, session_type, RESULTS_ONLY_LOAD, "session_info.ff1pkl")
+    return pd.DataFrame(session.results)
+
+
+def _load_round_laps(year, round_number, session_type):
+    """Load a single session's laps and return a plain copy of the lap columns"""
+    session = _load_session(year, round_number, session_type, LAPS_LOAD, "_extended_timing_data.ff1pkl")
+    return pd.DataFrame(session.laps)[LAP_COLUMNS].reset_index(drop=True)
+
+
+def _session_clock_offset(session, messages):
+    """UTC time of the session's time zero, to put session times on the race control clock
+
+    The leader taking the flag is both the session status turning to Finished and the
+    chequered flag message. Without one, the session is assumed to have started on schedule.
+    """
+    status = session.session_status
+    finished = status['Time'][status['Status'] == 'Finished']
+    chequered = messages['Time'][messages['Flag'] == 'CHEQUERED']
+    if len(finished) and len(chequered):
+        return chequered.iloc[0] - finished.iloc[0]
+    return session.date - session.session_start_time
+
+
+def _load_round_timeline(year, round_number, session_type):
+    """Load a session's race control messages and track status changes as one table in time order
+
+    Times are UTC. Track status changes are placed on the lap the leader was on.
+    """
+    session = _load_session(year, round_number, session_type, TIMELINE_LOAD, "race_control_messages.ff1pkl")
+    messages = session.race_control_messages
+    status = session.track_status
+    control = pd.DataFrame({
+        "Time": messages['Time'],
+        "Lap": messages['Lap'],
+        "Type": messages['Flag'].str.title().fillna(messages['Category'].replace(RACE_CONTROL_CATEGORIES)),
+        "Message": messages['Message']
+    })
+    if status.empty:
+        return control.sort_values('Time', kind='stable').reset_index(drop=True)
+
+    # Lap n started when the first driver started it
+    lap_starts = session.laps.groupby('LapNumber')['LapStartTime'].min().to_numpy()
+    track = pd.DataFrame({
+        "Time": status['Time'] + _session_clock_offset(session, messages),
+        "Lap": np.maximum(np.searchsorted(lap_starts, status['Time'].to_numpy(), side='right'), 1),
+        "Type": "Track",
+        "Message": status['Status'].map(TRACK_STATUS_MESSAGES).fillna(status['Message'])
+    })
+    events = pd.concat([control, track], ignore_index=True)
+    return events.sort_values('Time', kind='stable').reset_index(drop=True)
+
+
+def event_sessions(events, session_types):
+    """The (round number, session type) pairs held at the given schedule rows, in round order
+
+    Session types listed in SESSION_FORMATS are only held at events of those formats;
+    events of an unknown format only hold the others.
+    """
+    formats = events['EventFormat'] if 'EventFormat' in events else pd.Series(None, index=events.index)
+    return [
+        (int(round_number), session_type)
+        for round_number, event_format in zip(events['RoundNumber'], formats)
+        for session_type in session_types
+        if session_type not in SESSION_FORMATS or event_format in SESSION_FORMATS[session_type]
+    ]
+
+
+def load_sessions(year, sessions, max_workers=DEFAULT_LOAD_WORKERS, use_processes=False, on_result=None):
+    """Load the results of several (round number, session type) sessions concurrently.
+
+    Every session shares one pool, so loading sprints next to the races adds work to the
+    same workers rather than a second pass. Threads are used by default since loading is
+    dominated by network and cache reads; with use_processes the sessions are loaded and
+    decoded in worker processes instead. ``on_result`` is called with each round number,
+    session type and results as soon as they load.
+
+    Returns a dict of results keyed by (round number, session type), in the order given,
+    and a dict of the errors for sessions that failed to load.
+    """
+    sessions = list(sessions)
+    results = {}
+    failed_sessions = {}
+    if not sessions:
+        return results, failed_sessions
+
+    max_workers = max(1, min(max_workers, len(sessions)))
+    if use_processes:
+        # Worker processes need the same fastf1 cache when they are spawned rather than forked.
+        # Their session.load spans and cache counters stay in the worker processes.
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=initialize_fastf1,
+                                       initargs=(_fastf1_cache_dir,))
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    with executor:
+        futures = {
+            executor.submit(_load_round_results, year, round_number, session_type): (round_number, session_type)
+            for round_number, session_type in sessions
+        }
+        for future in as_completed(futures):
+            round_number, session_type = futures[future]
+            try:
+                results[round_number, session_type] = future.result()
+            except Exception as e:
+                logging.error(f"Error loading {session_type} session for round {round_number} of {year}: {e}")
+                failed_sessions[round_number, session_type] = e
+                continue
+            if on_result is not None:
+                on_result(round_number, session_type, results[round_number, session_type])
+
+    return {session: results[session] for session in sessions if session in results}, failed_sessions
+
+
+def _results_settled(event_date, results):
+    """Whether a session's results should no longer change
+
+    Rounds still within LEDGER_SETTLE_TIME of their event may be amended, and results that
+    came back without points have not been published yet.
+    """
+    return (event_date < pd.Timestamp(datetime.now()) - LEDGER_SETTLE_TIME
+            and results is not None and 'Points' in results and results['Points'].notna().any())
+
+
+def _store_if_settled(year, round_number, session_type, event_date, results):
+    """Persist a round to the ledger once its results should no longer change"""
+    if _results_settled(event_date, results):
+        results_ledger.store_round(year, round_number, session_type, results)
+
+
+TEAM_NATIONALITIES = {
+    "Red Bull Racing": "Austrian",
+    "Mercedes": "German",
+    "Ferrari": "Italian",
+    "McLaren": "British",
+    "Aston Martin": "British",
+    "Alpine": "French",
+    "Williams": "British",
+    "AlphaTauri": "Italian",
+    "Haas F1 Team": "American",
+    "Alfa Romeo": "Swiss",
+    "Racing Bulls": "Italian",
+    "Kick Sauber": "Swiss"
+}
+
+
+def lttb(x, y, threshold):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling
+
+    The first and last points are kept, and from each of threshold - 2 buckets in
+    between the point forming the largest triangle with the point kept before it and
+    the mean of the next bucket, which keeps the peaks and troughs of the series.
+    """
+    n = len(x)
+    if threshold is None or n <= threshold:
+        return np.arange(n)
+    threshold = max(threshold, 3)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    # Bucket means, followed by the last point, which stands in for the bucket after the last
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / counts, x[n - 1])
+    mean_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / counts, y[n - 1])
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    kept = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        areas = np.abs((x[kept] - next_x) * (y[start:end] - y[kept]) - (x[kept] - x[start:end]) * (next_y - y[kept]))
+        kept = start + int(np.argmax(areas))
+        keep[bucket + 1] = kept
+    return keep
+
+
+def lap_statistics(laps):
+    """Per-driver laps completed, fastest lap and race pace from a laps table, fastest pace first
+
+    Pace is the median of the laps not started or ended in the pits, leaving out the
+    opening lap; its delta is to the best pace of the race.
+    """
+    seconds = laps['LapTime'].dt.total_seconds()
+    clean = (laps['LapNumber'] > 1) & laps['PitInTime'].isna() & laps['PitOutTime'].isna()
+    frame = pd.DataFrame({
+        'Driver': laps['Driver'], 'LapNumber': laps['LapNumber'], 'Seconds': seconds, 'Pace': seconds.where(clean)
+    })
+    statistics = frame.groupby('Driver', sort=False).agg(
+        laps=('LapNumber', 'max'), fastest=('Seconds', 'min'), pace=('Pace', 'median')
+    )
+    fastest_laps = frame.dropna(subset=['Seconds']).sort_values('Seconds', kind='stable').drop_duplicates('Driver')
+    statistics['fastest_lap'] = fastest_laps.set_index('Driver')['LapNumber']
+    statistics['pace_delta'] = statistics['pace'] - statistics['pace'].min()
+    return statistics.sort_values(['pace', 'fastest'], na_position='last')
+
+
+def lap_sparklines(laps, drivers, width=None):
+    """A sparkline of each driver's lap times, downsampled with LTTB to at most width laps
+
+    Every line shares one scale, from the fastest lap of the race up to the
+    SPARKLINE_QUANTILE of its lap times, so taller blocks are slower laps for every driver alike.
+    """
+    timed = laps.dropna(subset=['LapTime']).sort_values(['Driver', 'LapNumber'], kind='stable')
+    if timed.empty:
+        return ["" for _ in drivers]
+    names = timed['Driver'].to_numpy()
+    lap_numbers = timed['LapNumber'].to_numpy(dtype=float)
+    seconds = timed['LapTime'].dt.total_seconds().to_numpy()
+    low, high = seconds.min(), np.quantile(seconds, SPARKLINE_QUANTILE)
+    high = max(high, low + 1e-3)
+
+    # Rows are sorted by driver, so each driver's laps are one contiguous slice
+    unique_names, starts = np.unique(names, return_index=True)
+    ends = np.append(starts[1:], len(names))
+    lines = {}
+    for name, start, end in zip(unique_names, starts, ends):
+        kept = seconds[start:end][lttb(lap_numbers[start:end], seconds[start:end], width)]
+        levels = np.clip((kept - low) / (high - low), 0, 1) * (len(SPARKLINE_BLOCKS) - 1)
+        lines[name] = "".join(SPARKLINE_BLOCKS[levels.round().astype(int)])
+    return [lines.get(driver, "") for driver in drivers]
+
+
+def head_to_head(laps, first, second):
+    """Lap-by-lap comparison of two drivers from a laps table
+
+    Both drivers' laps are laid out in arrays indexed by lap number, so the gap is one
+    subtraction of the session times at which each ended every lap. Returns lap numbers
+    1 to the last lap either completed, first's lead over second after each lap in seconds
+    (negative while first is behind, NaN where either has no time), both drivers'
+    compounds per lap and the number of laps each completed.
+    """
+    pair = laps[laps['Driver'].isin([first, second])].dropna(subset=['LapNumber'])
+    last_lap = int(pair['LapNumber'].max()) if not pair.empty else 0
+    # Row 0 is first and row 1 second; column n is lap n
+    rows = (pair['Driver'] == second).to_numpy().astype(int)
+    columns = pair['LapNumber'].to_numpy().astype(int)
+    ends = np.full((2, last_lap + 1), np.nan)
+    ends[rows, columns] = pair['Time'].dt.total_seconds().to_numpy()
+    compounds = np.full((2, last_lap + 1), "", dtype=object)
+    compounds[rows, columns] = pair['Compound'].fillna("").to_numpy()
+    completed = np.where(np.isfinite(ends), np.arange(last_lap + 1), 0).max(axis=1)
+    return {
+        "laps": np.arange(1, last_lap + 1),
+        "gap": (ends[1] - ends[0])[1:],
+        "compounds": compounds[:, 1:],
+        "completed": completed
+    }
+
+
+def _final_delta(first, second, comparison):
+    """The gap between two drivers where the shorter of their races ended, as text"""
+    completed_first, completed_second = (int(laps) for laps in comparison["completed"])
+    if completed_first != completed_second:
+        ahead, behind = (first, second) if completed_first > completed_second else (second, first)
+        laps = abs(completed_first - completed_second)
+        return f"{ahead} completed {laps} lap{'s' if laps > 1 else ''} more than {behind}"
+    gap = comparison["gap"][completed_first - 1] if completed_first else np.nan
+    if np.isnan(gap):
+        return "No laps in common"
+    ahead, behind = (first, second) if gap >= 0 else (second, first)
+    return f"{ahead} {abs(gap):.3f}s ahead of {behind} after lap {completed_first}"
+
+
+def _format_lap_times(seconds):
+    """Format lap times in seconds as m:ss.sss, with an empty string for missing times"""
+    return seconds.map(lambda value: "" if pd.isna(value) else f"{int(value // 60)}:{value % 60:06.3f}")
+
+
+def _rank(totals):
+    """Sort aggregated totals by points, keeping the existing order for ties, and number them"""
+    ranked = totals.sort_values('points', ascending=False, kind='stable').reset_index()
+    ranked.insert(0, 'position', np.arange(1, len(ranked) + 1))
+    return ranked
+
+
+def points_matrix(season, key, names, rounds):
+    """Points of each name in each round, as a rounds × names array
+
+    Rows follow rounds and columns follow names; NaN marks a round the name did not take part in.
+    """
+    if season.empty:
+        return np.full((len(rounds), len(names)), np.nan)
+    table = season.pivot_table(index='RoundNumber', columns=key, values='Points', aggfunc='sum')
+    return table.reindex(index=list(rounds), columns=list(names)).to_numpy(dtype=np.float64)
+
+
+def race_strengths(points):
+    """Plackett-Luce strength of each driver from a rounds × drivers points matrix
+
+    A driver's strength is their average points per round taken part in, plus
+    TITLE_ODDS_PRIOR_POINTS. Drivers missing from the latest round with results have
+    left the grid and get no strength.
+    """
+    raced = np.isfinite(points)
+    starts = raced.sum(axis=0)
+    average = np.where(starts > 0, np.nansum(points, axis=0) / np.maximum(starts, 1), 0.0)
+    latest = raced[np.flatnonzero(raced.any(axis=1))[-1]] if raced.any() else np.ones(points.shape[1], dtype=bool)
+    return np.where(latest, average + TITLE_ODDS_PRIOR_POINTS, 0.0)
+
+
+def simulate_seasons(strengths, sessions, runs, seed=None):
+    """Points each driver scores over the remaining sessions in each of runs simulated seasons
+
+    Finishing orders follow a Plackett-Luce model, where the chance of finishing ahead of
+    the rest is proportional to strength, drawn with the Gumbel-max trick. A pool of
+    TITLE_ODDS_POOL outcomes is drawn once per points system and each simulated season
+    adds up one random outcome of the pool per session, so nothing is sorted per season.
+    ``sessions`` holds the points per position of each remaining session.
+    """
+    rng = np.random.default_rng(seed)
+    count = len(strengths)
+    totals = np.zeros((runs, count), dtype=np.float32)
+    pools = {}
+    with np.errstate(divide='ignore'):
+        log_strengths = np.log(strengths)
+    for points in sessions:
+        pool = pools.get(points)
+        if pool is None:
+            scored = min(len(points), count)
+            keys = log_strengths + rng.gumbel(size=(TITLE_ODDS_POOL, count))
+            order = np.argsort(-keys, axis=1)[:, :scored]
+            pool = pools[points] = np.zeros((TITLE_ODDS_POOL, count), dtype=np.float32)
+            np.put_along_axis(pool, order, np.asarray(points[:scored], dtype=np.float32), axis=1)
+        totals += pool[rng.integers(0, TITLE_ODDS_POOL, runs)]
+    return totals
+
+
+def _title_counts(driver_points, team_points, driver_teams, strengths, sessions, runs, seed):
+    """Titles won and final points summed over runs simulated seasons, per driver and per team"""
+    gained = simulate_seasons(strengths, sessions, runs, seed)
+    drivers = driver_points + gained
+    membership = np.zeros((len(driver_points), len(team_points)), dtype=np.float32)
+    known = np.flatnonzero(driver_teams >= 0)
+    membership[known, driver_teams[known]] = 1
+    teams = team_points + gained @ membership
+    # Ties go to whoever is ahead in the standings, a stand-in for countback
+    return (
+        np.bincount(drivers.argmax(axis=1), minlength=len(driver_points)),
+        np.bincount(teams.argmax(axis=1), minlength=len(team_points)),
+        drivers.sum(axis=0, dtype=np.float64),
+        teams.sum(axis=0, dtype=np.float64)
+    )
+
+
+def project_championship(driver_points, team_points, driver_teams, strengths, sessions, runs=TITLE_ODDS_RUNS,
+                         processes=None, seed=None):
+    """Title odds and mean final points of every driver and team over the remaining sessions
+
+    Drivers and teams are in standings order with their current points; driver_teams maps
+    each driver to the index of their team, or -1. With processes, the runs are split over
+    that many worker processes, each drawing from its own random stream.
+    """
+    if processes and processes > 1:
+        seeds = np.random.SeedSequence(seed).spawn(processes)
+        shares = [runs // processes + (index < runs % processes) for index in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parts = list(executor.map(
+                _title_counts, *zip(*[(driver_points, team_points, driver_teams, strengths, sessions, share, worker_seed)
+                                      for share, worker_seed in zip(shares, seeds)])
+            ))
+    else:
+        parts = [_title_counts(driver_points, team_points, driver_teams, strengths, sessions, runs, seed)]
+    driver_titles, team_titles, driver_sums, team_sums = (sum(part[index] for part in parts) for index in range(4))
+    return {
+        "driver_odds": driver_titles / runs,
+        "team_odds": team_titles / runs,
+        "driver_projected": driver_sums / runs,
+        "team_projected": team_sums / runs
+    }
+
+
+def _format_odds(odds):
+    odds = np.asarray(odds)
+    text = np.char.add(np.char.mod("%.1f", odds * 100), "%")
+    return np.where(odds == 0, "-", np.where(odds < 0.001, "<0.1%", text))
+
+
+def _progression_sparklines(points, width=None):
+    """A sparkline per column of a rounds × names points matrix of the running totals, on one shared scale"""
+    totals = np.nancumsum(points, axis=0)
+    if width is not None:
+        totals = totals[-width:]
+    if totals.size == 0:
+        return ["" for _ in range(points.shape[1])]
+    levels = totals / max(totals.max(), 1) * (len(SPARKLINE_BLOCKS) - 1)
+    return ["".join(line) for line in SPARKLINE_BLOCKS[levels.round().astype(int)].T]
+
+
+class RaceTimeline:
+    """Race control messages and track status changes of a session, indexed by lap and time
+
+    Built once per session. Finding the first event of a lap or the event at a moment is
+    a lookup in sorted arrays, and only the rows asked for are formatted for display.
+    """
+    def __init__(self, events, race_name="", status=None):
+        self.events = events.reset_index(drop=True)
+        self.race_name = race_name
+        # "N/A" or "Error" when the timeline is a placeholder message
+        self.status = status
+        self.times = self.events['Time'].to_numpy()
+        # Messages now and then carry the previous lap; the running maximum keeps laps sorted
+        self.laps = np.maximum.accumulate(self.events['Lap'].to_numpy(dtype=np.int64))
+        # First row of each lap by lap number; laps without events point at the next lap's first row
+        self.lap_rows = np.searchsorted(self.laps, np.arange(self.last_lap + 2))
+
+    @classmethod
+    def placeholder(cls, status, message, race_name=""):
+        """Single-row timeline used for the no-data and error cases"""
+        events = pd.DataFrame({"Time": [pd.NaT], "Lap": [0], "Type": [status], "Message": [message]})
+        return cls(events, race_name, status)
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def last_lap(self):
+        return int(self.laps[-1]) if len(self.laps) else 0
+
+    def lap_row(self, lap):
+        """Row of the first event of a lap, or of the next lap with events"""
+        return min(int(self.lap_rows[max(0, min(lap, self.last_lap))]), max(len(self) - 1, 0))
+
+    def time_row(self, time):
+        """Row of the first event at or after a time"""
+        return min(int(np.searchsorted(self.times, np.datetime64(time, 'ns'))), max(len(self) - 1, 0))
+
+    def lap_at(self, row):
+        return int(self.laps[row]) if len(self.laps) else 0
+
+    def time_at(self, row):
+        return self.times[row] if len(self.times) else None
+
+    def rows(self, start, count):
+        """Display table of count events from a row on"""
+        window = self.events.iloc[start:start + count]
+        return _display(pd.DataFrame({
+            "time": window['Time'].dt.strftime('%H:%M:%S'),
+            "lap": window['Lap'].astype(str).where(window['Lap'] > 0, ""),
+            "type": window['Type'],
+            "message": window['Message']
+        }), RACE_TIMELINE_COLUMNS)
+
+
+def _display(frame, columns):
+    """Convert a table to the string columns the widgets render"""
+    return frame.reindex(columns=columns).fillna("").astype(str).reset_index(drop=True)
+
+
+def _typed(frame, columns):
+    """Select the columns of a table, keeping their types for machine-readable output"""
+    return frame.reindex(columns=columns).reset_index(drop=True)
+
+
+def _placeholder(columns, **values):
+    """Single-row table used for the no-data and error cases"""
+    return pd.DataFrame([{column: values.get(column, "") for column in columns}])
+
+
+class F1Data:
+    """Data service shared by all dashboard panels
+
+    Concurrent requests for the same season or race are coalesced into a single fetch
+    whose result is handed to every caller.
+    """
+    def __init__(self, max_workers=DEFAULT_LOAD_WORKERS, use_processes=False):
+        self.current_year = datetime.now().year
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.selected_race_index = -1  # -1 means most recent race
+        self.loading_state = LoadingState()
+        self.coalescer = RequestCoalescer()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        """Hit, miss and coalesced request counters for the service and its schedule cache"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalescer.coalesced,
+            "schedule_hits": schedule_cache.hits,
+            "schedule_misses": schedule_cache.misses,
+            "schedule_coalesced": schedule_cache.coalesced
+        }
+
+    def invalidate(self):
+        """Drop everything kept in memory that may have changed since it was loaded
+
+        Event schedules, season aggregates and projections go, along with the laps,
+        timelines and comparisons of rounds that have not settled yet; the next request
+        loads them again. Settled rounds stay, as does everything stored in the ledger.
+        """
+        settled_before = pd.Timestamp(datetime.now()) - LEDGER_SETTLE_TIME
+        settled = {}
+
+        def unsettled(key):
+            year, round_number = key[0], key[1]
+            if year not in settled:
+                schedule = schedule_cache.cached(year)
+                # Without a schedule every round of the season is treated as unsettled
+                settled[year] = set() if schedule is None else set(
+                    schedule['RoundNumber'][schedule['EventDate'] < settled_before].astype(int))
+            return round_number not in settled[year]
+
+        for cache in (_session_laps, _session_timelines, _head_to_heads):
+            cache.discard(unsettled)
+        with _memo_lock:
+            _season_aggregates.clear()
+            _projections.clear()
+        schedule_cache.invalidate()
+
+    @timing.timed()
+    def refresh_delay(self, year=None):
+        """Seconds until a season's data may next change, or None once it is closed"""
+        try:
+            schedule = schedule_cache.get(year or self.current_year)
+        except Exception as e:
+            logging.error(f"Error getting schedule for refresh: {e}")
+            return IDLE_POLL_INTERVAL
+        now = pd.Timestamp(datetime.now(timezone.utc)).tz_localize(None)
+        return refresh_delay(schedule, now)
+
+    @timing.timed()
+    def prune_cache(self, budget=f1cache.CACHE_BUDGET_BYTES):
+        """Bring the fastf1 cache in use back under its byte budget
+
+        The current season's sessions are left whole, since the lap analysis, head-to-head
+        and timeline panels would download their heavy artifacts again on the next view.
+        """
+        if _fastf1_cache_dir is None:
+            return None
+        return f1cache.prune(budget, _fastf1_cache_dir, keep_years=(self.current_year,))
+
+    @timing.timed()
+    def get_season_aggregate(self, year=None):
+        """Aggregate driver and constructor totals from a single pass over completed races.
+
+        Each completed round's results of every STANDINGS_SESSIONS session held there are
+        read once and folded into both tables.
+        The aggregate is memoized per season and keyed by the completed rounds once every
+        one of them has settled, so it is only rebuilt once a new race has finished. Until
+        then it is rebuilt on every request, picking up results as they are published.
+        """
+        year = year or self.current_year
+        completed_races = self._completed_races(year)
+        rounds = tuple(int(event) for event in completed_races['RoundNumber'])
+
+        cache_key = (year, rounds)
+        with _memo_lock:
+            aggregate = _season_aggregates.get(cache_key)
+        if aggregate is not None:
+            self.hits += 1
+            timing.count("season_aggregate.hits")
+            return aggregate
+
+        self.misses += 1
+        timing.count("season_aggregate.misses")
+        return self.coalescer.run(("season", cache_key), self._build_season_aggregate, completed_races, cache_key)
+
+    @timing.timed()
+    def _build_season_aggregate(self, completed_races, cache_key):
+        year, rounds = cache_key
+        session_results, failed_sessions = self.get_round_results(completed_races, STANDINGS_SESSIONS, year)
+        failed_rounds = {round_number: error for (round_number, _), error in failed_sessions.items()}
+        event_dates = dict(zip(completed_races['RoundNumber'].astype(int), completed_races['EventDate']))
+        unsettled_rounds = sorted({
+            round_number for round_number, session_type in event_sessions(completed_races, STANDINGS_SESSIONS)
+            if not _results_settled(event_dates[round_number], session_results.get((round_number, session_type)))
+        })
+
+        # One row per driver and session, so the points of every session of a round add up
+        if session_results:
+            season = pd.concat(session_results.values(), keys=session_results.keys(),
+                               names=['RoundNumber', 'SessionType', None]).reset_index(level=[0, 1])
+        else:
+            season = pd.DataFrame(columns=['RoundNumber', 'SessionType'] + ResultsLedger.COLUMNS)
+        season = season.assign(
+            Driver=season['FirstName'] + " " + season['LastName'],
+            # Only Grand Prix wins count as wins
+            Won=((season['Position'] == 1) & (season['SessionType'] == 'R')).astype(int),
+            Points=season['Points'].astype(float)
+        )
+
+        # Drivers are listed with the team of their latest round, which the projection credits
+        # their remaining points to; both tables keep first-appearance order for ties
+        season = season.sort_values('RoundNumber', kind='stable')
+        drivers = season.groupby('Driver', sort=False).agg(
+            team=('TeamName', 'last'), points=('Points', 'sum'), wins=('Won', 'sum')
+        )
+        teams = season.groupby('TeamName', sort=False).agg(
+            points=('Points', 'sum'), wins=('Won', 'sum')
+        )
+        teams.insert(0, 'nationality', teams.index.map(TEAM_NATIONALITIES).fillna("Unknown"))
+
+        drivers = _rank(drivers.rename_axis('driver'))
+        teams = _rank(teams.rename_axis('team'))
+        aggregate = {
+            "rounds": rounds,
+            "failed_rounds": failed_rounds,
+            "unsettled_rounds": unsettled_rounds,
+            "drivers": drivers,
+            "teams": teams,
+            # Points per round, with columns in standings order
+            "driver_points": points_matrix(season, 'Driver', drivers['driver'], rounds),
+            "team_points": points_matrix(season, 'TeamName', teams['team'], rounds)
+        }
+        # A rebuild supersedes whatever was kept for the season, and only an aggregate of
+        # settled rounds is kept; rounds that failed to load or have not settled are loaded
+        # again on the next refresh
+        with _memo_lock:
+            for key in [key for key in _season_aggregates if key[0] == year]:
+                del _season_aggregates[key]
+            if not (failed_rounds or unsettled_rounds):
+                _season_aggregates[cache_key] = aggregate
+        return aggregate
+
+    @timing.timed()
+    def get_round_results(self, events, session_types=STANDINGS_SESSIONS, year=None):
+        """Get results of the given session types held at the given schedule rows, loading
+        only sessions missing from the ledger.
+
+        Missing sessions of every type load together in one pool, and each is stored in the
+        ledger as soon as it has loaded, so an interrupted pass resumes from the sessions
+        still missing. Returns the results keyed by (round number, session type) in round
+        order, then in the order of session_types, and the errors of sessions that failed to load.
+        """
+        year = year or self.current_year
+        event_dates = dict(zip(events['RoundNumber'].astype(int), events['EventDate']))
+        sessions = event_sessions(events, session_types)
+        stored = {}
+        for session_type in session_types:
+            stored.update(((round_number, session_type), results) for round_number, results
+                          in results_ledger.load_rounds(year, event_dates, session_type).items())
+
+        def store(round_number, session_type, results):
+            _store_if_settled(year, round_number, session_type, event_dates[round_number], results)
+
+        missing_sessions = [session for session in sessions if session not in stored]
+        timing.count("ledger.hits", len(sessions) - len(missing_sessions))
+        timing.count("ledger.misses", len(missing_sessions))
+        loaded_results, failed_sessions = load_sessions(
+            year, missing_sessions, max_workers=self.max_workers, use_processes=self.use_processes, on_result=store
+        )
+
+        session_results = {session: stored.get(session, loaded_results.get(session)) for session in sessions}
+        return {session: results for session, results in session_results.items() if results is not None}, failed_sessions
+
+    @timing.timed()
+    def _race_results(self, year, race):
+        """Results of one race, read from the ledger once the round has been stored"""
+        round_number = int(race['RoundNumber'])
+        stored = results_ledger.load_rounds(year, [round_number], 'R')
+        if round_number in stored:
+            timing.count("ledger.hits")
+            return stored[round_number]
+        timing.count("ledger.misses")
+
+        # Share the load with any concurrent request for the same race
+        results = self.coalescer.run(
+            ("race", year, round_number, 'R'),
+            _load_round_results, year, round_number, 'R'
+        )
+        _store_if_settled(year, round_number, 'R', race['EventDate'], results)
+        return results
+
+    @timing.timed()
+    def get_driver_standings(self, year=None, typed=False):
+        """Get driver standings of a season, the current one by default, as display-ready columns
+
+        With typed, positions, points and wins keep their numeric types.
+        """
+        self.loading_state.set_loading(True, "Fetching driver standings...")
+        try:
+            aggregate = self.get_season_aggregate(year)
+
+            if not aggregate["rounds"]:
+                self.loading_state.set_loading(False)
+                return _placeholder(DRIVER_STANDINGS_COLUMNS, position="N/A", driver="No completed races")
+
+            self.loading_state.set_loading(False)
+            return (_typed if typed else _display)(aggregate["drivers"], DRIVER_STANDINGS_COLUMNS)
+        except Exception as e:
+            logging.error(f"Error getting driver standings: {e}")
+            self.loading_state.set_loading(False)
+            return _placeholder(DRIVER_STANDINGS_COLUMNS, position="Error", driver="Failed to load data")
+
+    @timing.timed()
+    def get_team_standings(self, year=None, typed=False):
+        """Get constructor standings of a season, the current one by default, as display-ready columns
+
+        With typed, positions, points and wins keep their numeric types.
+        """
+        self.loading_state.set_loading(True, "Fetching team standings...")
+        try:
+            # Shares the season pass with the driver standings
+            aggregate = self.get_season_aggregate(year)
+
+            if not aggregate["rounds"]:
+                self.loading_state.set_loading(False)
+                return _placeholder(TEAM_STANDINGS_COLUMNS, position="N/A", team="No completed races")
+
+            self.loading_state.set_loading(False)
+            return (_typed if typed else _display)(aggregate["teams"], TEAM_STANDINGS_COLUMNS)
+        except Exception as e:
+            logging.error(f"Error getting team standings: {e}")
+            self.loading_state.set_loading(False)
+            return _placeholder(TEAM_STANDINGS_COLUMNS, position="Error", team="Failed to load data")
+
+    def get_championship_projection(self, year=None, runs=TITLE_ODDS_RUNS):
+        """Title odds and projected final points over the rounds of the season still to be raced
+
+        Builds on the season aggregate's points matrices and is memoized like it, per
+        season, completed rounds and remaining rounds.
+        """
+        year = year or self.current_year
+        aggregate = self.get_season_aggregate(year)
+        schedule = schedule_cache.get(year)
+        upcoming = schedule[(schedule['EventDate'] >= pd.Timestamp(datetime.now())) & (schedule['RoundNumber'] > 0)]
+        # Points per position of every standings session still to run, grouped by round
+        rounds = {}
+        for round_number, session_type in event_sessions(upcoming, STANDINGS_SESSIONS):
+            rounds.setdefault(round_number, []).append(SESSION_POINTS[session_type])
+        sessions = tuple(tuple(points) for points in rounds.values())
+
+        cache_key = (year, aggregate["rounds"], sessions, runs)
+        with _memo_lock:
+            projection = _projections.get(cache_key)
+        if projection is not None:
+            timing.count("projection.hits")
+            return projection
+        timing.count("projection.misses")
+        return self.coalescer.run(("projection", cache_key), self._build_projection, aggregate, cache_key)
+
+    @timing.timed()
+    def _build_projection(self, aggregate, cache_key):
+        year, rounds, sessions, runs = cache_key
+        drivers, teams = aggregate["drivers"], aggregate["teams"]
+        team_index = {team: index for index, team in enumerate(teams['team'])}
+        projection = project_championship(
+            drivers['points'].to_numpy(dtype=np.float32),
+            teams['points'].to_numpy(dtype=np.float32),
+            np.array([team_index.get(team, -1) for team in drivers['team']], dtype=int),
+            race_strengths(aggregate["driver_points"]),
+            tuple(points for round_sessions in sessions for points in round_sessions), runs,
+            processes=self.max_workers if self.use_processes else None
+        )
+        projection["remaining"] = len(sessions)
+        # Projections from rounds still missing results would outlive them, like the aggregate
+        with _memo_lock:
+            for key in [key for key in _projections if key[0] == year]:
+                del _projections[key]
+            if not (aggregate["failed_rounds"] or aggregate["unsettled_rounds"]):
+                _projections[cache_key] = projection
+        return projection
+
+    @timing.timed()
+    def get_championship(self, table="drivers", year=None, width=None):
+        """Get the points progression, projected points and title odds of the drivers or teams
+        as display-ready columns, with progression sparklines of at most width rounds"""
+        self.loading_state.set_loading(True, "Simulating the championship...")
+        try:
+            aggregate = self.get_season_aggregate(year)
+
+            if not aggregate["rounds"]:
+                self.loading_state.set_loading(False)
+                return _placeholder(CHAMPIONSHIP_COLUMNS, position="N/A", name="No completed races")
+
+            projection = self.get_championship_projection(year)
+            prefix = "driver" if table == "drivers" else "team"
+            standings = aggregate[table]
+            championship = pd.DataFrame({
+                "position": standings['position'],
+                "name": standings[prefix],
+                "points": standings['points'],
+                "progression": _progression_sparklines(aggregate[f"{prefix}_points"], width),
+                "projected": projection[f"{prefix}_projected"].round().astype(int),
+                "odds": _format_odds(projection[f"{prefix}_odds"]),
+                "remaining": projection["remaining"]  # Rounds left, for the panel title
+            })
+
+            self.loading_state.set_loading(False)
+            return _display(championship, CHAMPIONSHIP_COLUMNS)
+        except Exception as e:
+            logging.error(f"Error getting championship projection: {e}")
+            self.loading_state.set_loading(False)
+            return _placeholder(CHAMPIONSHIP_COLUMNS, position="Error", name="Failed to load data")
+
+    def _get_team_nationality(self, team_name):
+        """Map team name to nationality (simplified)"""
+        return TEAM_NATIONALITIES.get(team_name, "Unknown")
+
+    @timing.timed()
+    def get_race_schedule(self, year=None, typed=False):
+        """Get race schedule of a season, the current one by default, as display-ready columns
+
+        With typed, round numbers stay integers.
+        """
+        self.loading_state.set_loading(True, "Fetching race schedule...")
+        try:
+            # Get race schedule
+            schedule = schedule_cache.get(year or self.current_year)
+
+            now = pd.Timestamp(datetime.now())
+            if 'Session5DateUtc' in schedule:
+                in_progress = schedule['Session5DateUtc'] < now
+            else:
+                in_progress = False
+            status = np.select(
+                [schedule['EventDate'] < now, in_progress],
+                ["Completed", "In Progress"],
+                default="Upcoming"
+            )
+
+            races = pd.DataFrame({
+                "round": schedule["RoundNumber"],
+                "name": schedule["EventName"],
+                "circuit": schedule["Location"],  # Use Location instead of CircuitName
+                "date": schedule["EventDate"].dt.strftime("%Y-%m-%d"),
+                "status": status
+            })
+
+            self.loading_state.set_loading(False)
+            return (_typed if typed else _display)(races, SCHEDULE_COLUMNS)
+        except Exception as e:
+            logging.error(f"Error getting race schedule: {e}")
+            self.loading_state.set_loading(False)
+            return _placeholder(SCHEDULE_COLUMNS, round="Error", name="Failed to load data")
+
+    @timing.timed()
+    def _completed_races(self, year):
+        schedule = schedule_cache.get(year)
+        # Pre-season testing is round 0 and holds no race
+        return schedule[(schedule['EventDate'] < pd.Timestamp(datetime.now())) & (schedule['RoundNumber'] > 0)]
+
+    @timing.timed()
+    def get_completed_races(self, year=None):
+        """Get list of completed races"""
+        try:
+            return self._completed_races(year or self.current_year)
+        except Exception as e:
+            logging.error(f"Error getting completed races: {e}")
+            return pd.DataFrame()
+
+    @timing.timed()
+    def get_race_index(self, round_number, year=None):
+        """Index into the completed races of a round number, or None if it has not been raced
+
+        Unlike get_completed_races, a schedule that fails to load raises, so the failure is
+        not mistaken for a round still to be raced.
+        """
+        try:
+            completed_races = self._completed_races(year or self.current_year)
+        except Exception as e:
+            logging.error(f"Error getting completed races: {e}")
+            raise
+        matches = np.flatnonzero(completed_races['RoundNumber'].to_numpy() == round_number)
+        return int(matches[0]) if len(matches) else None
+
+    def _select_race(self, completed_races, race_index):
+        """Schedule row of a completed race; None or -1 selects the most recent one"""
+        if race_index is None or race_index == -1:
+            return completed_races.iloc[-1]
+        # Clamp to valid indices
+        return completed_races.iloc[max(0, min(race_index, len(completed_races) - 1))]
+
+    @timing.timed()
+    def _race_laps(self, year, race, session_type='R'):
+        """Laps of one race, from memory, the column store once settled, or fastf1"""
+        key = (year, int(race['RoundNumber']), session_type)
+        laps = _session_laps.get(key)
+        if laps is not None:
+            return laps
+
+        laps = results_ledger.load_laps(*key)
+        if laps is None:
+            laps = self.coalescer.run(("laps",) + key, _load_round_laps, *key)
+            if race['EventDate'] < pd.Timestamp(datetime.now()) - LEDGER_SETTLE_TIME and not laps.empty:
+                results_ledger.store_laps(*key, laps)
+
+        _session_laps.put(key, laps)
+        return laps
+
+    @timing.timed()
+    def _race_timeline(self, year, race, session_type='R'):
+        """Timeline of one race, from memory, the column store once settled, or fastf1"""
+        key = (year, int(race['RoundNumber']), session_type)
+        timeline = _session_timelines.get(key)
+        if timeline is not None:
+            return timeline
+
+        events = results_ledger.load_timeline(*key)
+        if events is None:
+            events = self.coalescer.run(("timeline",) + key, _load_round_timeline, *key)
+            if race['EventDate'] < pd.Timestamp(datetime.now()) - LEDGER_SETTLE_TIME and not events.empty:
+                results_ledger.store_timeline(*key, events)
+
+        timeline = RaceTimeline(events, race['EventName'])
+        _session_timelines.put(key, timeline)
+        return timeline
+
+    @timing.timed()
+    def get_lap_analysis(self, race_index=None, year=None, width=None):
+        """Get per-driver fastest laps, pace deltas and lap time sparklines of a race as display-ready columns
+
+        Sparklines are downsampled to at most width laps.
+        """
+        self.loading_state.set_loading(True, "Fetching lap times...")
+        try:
+            year = year or self.current_year
+            completed_races = self.get_completed_races(year)
+
+            if completed_races.empty:
+                self.loading_state.set_loading(False)
+                return _placeholder(LAP_ANALYSIS_COLUMNS, driver="N/A", trace="No completed races")
+
+            race = self._select_race(completed_races, race_index)
+            laps = self._race_laps(year, race)
+            if laps.empty:
+                self.loading_state.set_loading(False)
+                return _placeholder(LAP_ANALYSIS_COLUMNS, driver="N/A", trace="No lap times for this race",
+                                    race_name=race['EventName'])
+
+            statistics = lap_statistics(laps)
+            analysis = pd.DataFrame({
+                "driver": statistics.index,
+                "fastest": _format_lap_times(statistics['fastest']).to_numpy(),
+                "lap": statistics['fastest_lap'].astype("Int64").astype(str).where(statistics['fastest_lap'].notna(), ""),
+                "delta": statistics['pace_delta'].map(lambda delta: "" if pd.isna(delta) else f"+{delta:.3f}").to_numpy(),
+                "trace": lap_sparklines(laps, statistics.index, width),
+                "race_name": race['EventName']
+            })
+
+            self.loading_state.set_loading(False)
+            return _display(analysis, LAP_ANALYSIS_COLUMNS)
+        except Exception as e:
+            logging.error(f"Error getting lap analysis: {e}")
+            self.loading_state.set_loading(False)
+            return _placeholder(LAP_ANALYSIS_COLUMNS, driver="Error", trace="Failed to load data", race_name="Error")
+
+    @timing.timed()
+    def get_head_to_head(self, first=None, second=None, race_index=None, year=None, width=None):
+        """Compare two drivers lap by lap in a race, by default its first two finishers
+
+        Comparisons are kept per driver pair, so switching back to a pair does not compute
+        it again. The gap and compounds are downsampled with LTTB to at most width laps.
+        Returns plain lists, with the race's drivers in finishing order to choose from, and
+        a status of "N/A" or "Error" with a message instead when there is nothing to compare.
+        """
+        self.loading_state.set_loading(True, "Fetching lap times...")
+        try:
+            year = year or self.current_year
+            completed_races = self.get_completed_races(year)
+
+            if completed_races.empty:
+                self.loading_state.set_loading(False)
+                return {"status": "N/A", "message": "No completed races", "race_name": ""}
+
+            race = self._select_race(completed_races, race_index)
+            laps = self._race_laps(year, race)
+            # Finishing order: most laps completed, then position on the last of them
+            last_laps = laps.sort_values('LapNumber', kind='stable').drop_duplicates('Driver', keep='last')
+            drivers = last_laps.sort_values(['LapNumber', 'Position'], ascending=[False, True])['Driver'].tolist()
+            if len(drivers) < 2:
+                self.loading_state.set_loading(False)
+                return {"status": "N/A", "message": "No lap times for this race", "race_name": race['EventName']}
+
+            first = first if first in drivers else drivers[0]
+            second = second if second in drivers and second != first else next(d for d in drivers if d != first)
+            key = (year, int(race['RoundNumber']), first, second)
+            comparison = _head_to_heads.get(key)
+            if comparison is None:
+                comparison = head_to_head(laps, first, second)
+                _head_to_heads.put(key, comparison)
+
+            timed = np.flatnonzero(np.isfinite(comparison["gap"]))
+            kept = timed[lttb(comparison["laps"][timed].astype(float), comparison["gap"][timed], width)]
+            self.loading_state.set_loading(False)
+            return {
+                "status": None,
+                "race_name": race['EventName'],
+                "drivers": drivers,
+                "first": first,
+                "second": second,
+                "laps": comparison["laps"][kept].tolist(),
+                "gap": comparison["gap"][kept].round(3).tolist(),
+                "compounds": comparison["compounds"][:, kept].tolist(),
+                "final": _final_delta(first, second, comparison)
+            }
+        except Exception as e:
+            logging.error(f"Error getting head to head comparison: {e}")
+            self.loading_state.set_loading(False)
+            return {"status": "Error", "message": "Failed to load data", "race_name": "Error"}
+
+    @timing.timed()
+    def get_race_timeline(self, race_index=None, year=None):
+        """Get the race control messages and track status changes of a race as a RaceTimeline"""
+        self.loading_state.set_loading(True, "Fetching race control messages...")
+        try:
+            year = year or self.current_year
+            completed_races = self.get_completed_races(year)
+
+            if completed_races.empty:
+                self.loading_state.set_loading(False)
+                return RaceTimeline.placeholder("N/A", "No completed races")
+
+            race = self._select_race(completed_races, race_index)
+            timeline = self._race_timeline(year, race)
+            self.loading_state.set_loading(False)
+            if not len(timeline):
+                return RaceTimeline.placeholder("N/A", "No race control messages for this race", race['EventName'])
+            return timeline
+        except Exception as e:
+            logging.error(f"Error getting race timeline: {e}")
+            self.loading_state.set_loading(False)
+            return RaceTimeline.placeholder("Error", "Failed to load data", "Error")
+
+    @timing.timed()
+    def get_race_results(self, race_index=None, year=None, typed=False):
+        """Get results from a specific race or the last completed race if race_index is None
+
+        With typed, positions are integers, missing for drivers who were not classified,
+        times are seconds and points are numbers.
+        """
+        self.loading_state.set_loading(True, "Fetching race results...")
+        try:
+            year = year or self.current_year
+            completed_races = self.get_completed_races(year)
+
+            if completed_races.empty:
+                self.loading_state.set_loading(False)
+                return _placeholder(RACE_RESULTS_COLUMNS, position="N/A", driver="No completed races")
+
+            race = self._select_race(completed_races, race_index)
+            race_name = race['EventName']
+
+            results = self._race_results(year, race)
+
+            race_results = pd.DataFrame({
+                "position": results["Position"].astype("Int64"),
+                "driver": results["FirstName"] + " " + results["LastName"],
+                "team": results["TeamName"],
+                "time": pd.to_timedelta(results["Time"]),
+                "points": results["Points"],
+                "race_name": race_name  # Include race name for display
+            })
+
+            self.loading_state.set_loading(False)
+            if typed:
+                return _typed(race_results.assign(time=race_results["time"].dt.total_seconds()), RACE_RESULTS_COLUMNS)
+            return _display(race_results.assign(
+                position=race_results["position"].astype(str).where(race_results["position"].notna(), "DNF"),
+                time=race_results["time"].astype(str).where(race_results["time"].notna(), "DNF")
+            ), RACE_RESULTS_COLUMNS)
+        except Exception as e:
+            logging.error(f"Error getting race results: {e}")
+            self.loading_state.set_loading(False)
+            return _placeholder(RACE_RESULTS_COLUMNS, position="Error", driver="Failed to load data", race_name="Error")
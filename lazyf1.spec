@@ -10,7 +10,9 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Only used by fastf1's plotting and legacy modules, which lazyf1 never imports, and
+    # pulled in by PyInstaller's standard hooks without lazyf1 ever importing them
+    excludes=['matplotlib', 'scipy', 'PIL', 'tkinter'],
     noarchive=False,
     optimize=0,
 )
@@ -25,7 +27,8 @@ exe = EXE(
     name='lazyf1',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=True,
+    # Stripping corrupts the OpenBLAS library bundled with numpy 2, so numpy fails to import
+    strip=False,
     upx=True,
     upx_exclude=[],
     runtime_tmpdir=None,
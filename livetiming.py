@@ -0,0 +1,254 @@
+"""Live timing state kept up to date from fastf1's live timing stream.
+
+fastf1's ``SignalRClient`` writes every message of the F1 live timing feed to a text
+file, one ``[topic, data, timestamp]`` message per line. Messages are deltas: each
+carries only the fields that changed. ``LiveState`` merges them into per-driver state
+and remembers which drivers changed, so the dashboard only rebuilds their rows.
+
+Messages come either from the live feed, recorded to a file while it is read, or from
+a recording replayed at a chosen speed, which also load-tests the pipeline offline.
+
+Only the standard library is imported here; fastf1 is imported when the live feed starts.
+"""
+
+import ast
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from common import live_dir
+
+# Topics merged into the live state; the compressed car data and position topics are skipped
+LIVE_TOPICS = frozenset(["DriverList", "TimingData", "TimingAppData", "LapCount", "TrackStatus", "SessionInfo"])
+
+# Seconds without a new line after which the live feed is treated as finished
+LIVE_FEED_TIMEOUT = 60
+
+# How often the recording is polled for new lines while following the live feed
+LIVE_POLL_INTERVAL = 0.1
+
+
+# Fractional seconds of a timestamp, which the feed sends with up to seven digits
+TIMESTAMP_FRACTION = re.compile(r"\.(\d+)")
+
+
+def parse_timestamp(text):
+    """Parse a feed timestamp such as 2025-03-16T04:03:11.1234567Z
+
+    Before Python 3.11, fromisoformat takes neither a Z suffix nor fractions other than
+    three or six digits, so the timestamp is brought into that form first.
+    """
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    return datetime.fromisoformat(
+        TIMESTAMP_FRACTION.sub(lambda match: "." + match.group(1)[:6].ljust(6, "0"), text, count=1)
+    )
+
+
+def parse_message(line):
+    """Parse one recorded line into (topic, data, timestamp), or None if it is malformed"""
+    # Lines are Python reprs; converting them to JSON is much faster than literal_eval
+    text = line.strip().replace("'", '"').replace("True", "true").replace("False", "false")
+    try:
+        topic, data, timestamp = json.loads(text)
+    except ValueError:
+        # Strings containing quotes, such as team names, break the conversion
+        try:
+            topic, data, timestamp = ast.literal_eval(line.strip())
+        except (ValueError, SyntaxError):
+            return None
+    try:
+        return topic, data, parse_timestamp(timestamp)
+    except (TypeError, ValueError):
+        return None
+
+
+def _normalize(value):
+    """Turn lists into dicts keyed by index, the form later deltas of the same field use"""
+    if isinstance(value, list):
+        return {str(index): _normalize(item) for index, item in enumerate(value)}
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def merge(target, delta):
+    """Merge a delta message into target in place"""
+    for key, value in delta.items():
+        if isinstance(value, (dict, list)) and isinstance(target.get(key), dict):
+            merge(target[key], _normalize(value))
+        else:
+            target[key] = _normalize(value)
+
+
+class LiveState:
+    """Session state built up from live timing deltas
+
+    ``apply`` runs on the thread reading the feed and ``take_changes`` on the event loop,
+    so both hold a lock.
+    """
+    def __init__(self):
+        # Per driver number, the merged state of each per-driver topic
+        self.drivers = {}
+        self.session = {}
+        self.lap_count = {}
+        self.track_status = {}
+        self.messages = 0
+        self._changed = set()
+        self._session_changed = False
+        self._lock = threading.Lock()
+
+    def apply(self, topic, data):
+        """Merge one message, remembering which drivers it changed"""
+        if topic not in LIVE_TOPICS or not isinstance(data, dict):
+            return
+        with self._lock:
+            self.messages += 1
+            if topic == "DriverList":
+                lines = data
+            elif topic in ("TimingData", "TimingAppData"):
+                lines = data.get("Lines", {})
+            else:
+                target = {"LapCount": self.lap_count, "TrackStatus": self.track_status, "SessionInfo": self.session}
+                merge(target[topic], data)
+                self._session_changed = True
+                return
+
+            for number, delta in lines.items():
+                # DriverList also carries a plain "_kf" flag next to the drivers
+                if not isinstance(delta, dict):
+                    continue
+                merge(self.drivers.setdefault(number, {}).setdefault(topic, {}), delta)
+                self._changed.add(number)
+
+    def take_changes(self):
+        """Drivers changed since the last call, and whether the session header changed"""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            session_changed, self._session_changed = self._session_changed, False
+        return changed, session_changed
+
+    def driver_row(self, number):
+        """Display cells of a driver's timing row"""
+        with self._lock:
+            driver = self.drivers.get(number, {})
+            info = driver.get("DriverList", {})
+            timing = driver.get("TimingData", {})
+            stints = driver.get("TimingAppData", {}).get("Stints", {})
+            # Stints are keyed by index; the highest one is the current stint
+            stint = stints[max(stints, key=int)] if stints else {}
+
+            if timing.get("Retired") or timing.get("Stopped"):
+                status = "OUT"
+            elif timing.get("InPit"):
+                status = "PIT"
+            else:
+                status = ""
+            return [
+                str(timing.get("Position") or info.get("Line") or ""),
+                info.get("Tla") or number,
+                info.get("TeamName", ""),
+                str(timing.get("GapToLeader", "")),
+                str(timing.get("IntervalToPositionAhead", {}).get("Value", "")),
+                str(timing.get("LastLapTime", {}).get("Value", "")),
+                str(timing.get("BestLapTime", {}).get("Value", "")),
+                str(timing.get("NumberOfLaps", "")),
+                stint.get("Compound", "")[:1] + status
+            ]
+
+    def order(self):
+        """Driver numbers in running order"""
+        def position(number):
+            driver = self.drivers[number]
+            value = driver.get("TimingData", {}).get("Position") or driver.get("DriverList", {}).get("Line")
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return 99
+        with self._lock:
+            return sorted(self.drivers, key=lambda number: (position(number), int(number) if number.isdigit() else 0))
+
+    def title(self):
+        with self._lock:
+            meeting = self.session.get("Meeting", {}).get("Name", "")
+            name = " ".join(part for part in (meeting, self.session.get("Name", "")) if part)
+            if self.lap_count.get("CurrentLap"):
+                name += f" | Lap {self.lap_count['CurrentLap']}/{self.lap_count.get('TotalLaps', '?')}"
+            if self.track_status.get("Message"):
+                name += f" | {self.track_status['Message']}"
+            return name
+
+
+def replay(path, speed=1.0, is_cancelled=lambda: False):
+    """Yield the messages of a recording, spaced out by their timestamps divided by speed
+
+    A speed of 0 replays as fast as the messages can be read.
+    """
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if is_cancelled():
+                return
+            message = parse_message(line)
+            if message is None:
+                continue
+            timestamp = message[2]
+            if speed > 0 and previous is not None and timestamp > previous:
+                time.sleep((timestamp - previous).total_seconds() / speed)
+            previous = timestamp
+            yield message
+
+
+def follow_live(is_cancelled=lambda: False, path=None):
+    """Yield live timing messages as fastf1's client receives them
+
+    The client records the stream to ``path``, by default a new file under the live
+    directory, which is followed as it grows and can be replayed afterwards. The client
+    is stopped once the caller cancels or stops iterating.
+    """
+    from fastf1.livetiming.client import SignalRClient
+
+    if path is None:
+        os.makedirs(live_dir, exist_ok=True)
+        path = os.path.join(live_dir, datetime.now().strftime("live-%Y%m%d-%H%M%S.txt"))
+    client = SignalRClient(path, timeout=LIVE_FEED_TIMEOUT, logger=logging.getLogger("fastf1.livetiming"))
+    thread = threading.Thread(target=client.start, name="livetiming", daemon=True)
+    thread.start()
+    logging.info(f"Recording live timing to {path}")
+
+    try:
+        # The client creates the file once connected
+        while not os.path.exists(path):
+            if is_cancelled() or not thread.is_alive():
+                return
+            time.sleep(LIVE_POLL_INTERVAL)
+
+        with open(path, encoding="utf-8") as f:
+            pending = ""
+            while not is_cancelled():
+                pending += f.readline()
+                if pending.endswith("\n"):
+                    message = parse_message(pending)
+                    pending = ""
+                    if message is not None:
+                        yield message
+                elif thread.is_alive():
+                    time.sleep(LIVE_POLL_INTERVAL)
+                else:
+                    return
+    finally:
+        stop_client(client)
+
+
+def stop_client(client):
+    """Make a SignalRClient disconnect and close its recording
+
+    The client has no stop method, but its supervisor, checking every second, closes
+    the connection and the recording once no message came within the timeout; a
+    negative timeout has always run out.
+    """
+    client.timeout = -1
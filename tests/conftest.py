@@ -0,0 +1,67 @@
+"""Shared fixtures: fastf1 in offline mode on a copy of the bundled cache fixtures"""
+
+import os
+import shutil
+import sys
+import warnings
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fixtures import FIXTURE_CACHE, FIXTURE_YEAR, fixture_schedule, score_results  # noqa: E402
+
+
+@pytest.fixture
+def f1_data(tmp_path, monkeypatch):
+    """An F1Data service on the fixture season, with empty ledgers and caches"""
+    import fastf1
+    import fastf1.events
+
+    import common
+    import f1cache
+    import f1data
+
+    cache = tmp_path / "cache"
+    shutil.copytree(FIXTURE_CACHE, cache)
+    # Keep fastf1's log out of the user's data directory
+    monkeypatch.setattr(common, "log_file", str(tmp_path / "logs" / "f1dashboard.log"))
+    f1data.initialize_fastf1(str(cache))
+    fastf1.Cache.offline_mode(True)
+    monkeypatch.setattr(fastf1, "get_event_schedule", fixture_schedule)
+    monkeypatch.setattr(fastf1.events, "get_event_schedule", fixture_schedule)
+    monkeypatch.setattr(f1cache, "cache_usage", f1cache.CacheUsage(str(tmp_path / "cache_usage.sqlite")))
+    monkeypatch.setattr(f1data, "results_ledger",
+                        f1data.ResultsLedger(str(tmp_path / "results.sqlite"), str(tmp_path / "store")))
+    # Ergast requests fail in offline mode; fastf1 falls back to the live timing data
+    warnings.filterwarnings("ignore", module="fastf1")
+
+    f1data._season_aggregates.clear()
+    f1data._projections.clear()
+    f1data._session_laps.clear()
+    f1data._session_timelines.clear()
+    f1data._head_to_heads.clear()
+    f1data.schedule_cache.invalidate()
+    service = f1data.F1Data()
+    service.current_year = FIXTURE_YEAR
+    yield service
+    f1data._season_aggregates.clear()
+    f1data._projections.clear()
+    f1data._session_laps.clear()
+    f1data._session_timelines.clear()
+    f1data._head_to_heads.clear()
+    f1data.schedule_cache.invalidate()
+
+
+@pytest.fixture
+def scored_results(monkeypatch):
+    """Have loaded results carry positions and points, which the offline fixtures lack"""
+    import f1data
+
+    load_round_results = f1data._load_round_results
+
+    def load_with_points(year, round_number, session_type):
+        return score_results(load_round_results(year, round_number, session_type))
+
+    monkeypatch.setattr(f1data, "_load_round_results", load_with_points)
+    return load_with_points
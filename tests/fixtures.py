@@ -0,0 +1,60 @@
+"""The fastf1 cache fixtures bundled under cache/, shared by the tests and the benchmarks"""
+
+import os
+import pickle
+from datetime import datetime
+from glob import glob
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_CACHE = os.path.join(REPO_DIR, "cache")
+FIXTURE_YEAR = 2025
+
+
+def fixture_schedule(year, include_testing=True, **kwargs):
+    """Event schedule rebuilt from the fixture session info, led by a pre-season test
+
+    The fixtures only hold live timing artifacts, not the event schedule, so this stands in
+    for fastf1.get_event_schedule.
+    """
+    import pandas as pd
+    from fastf1.events import EventSchedule
+
+    events = []
+    for path in sorted(glob(os.path.join(FIXTURE_CACHE, str(year), "*", "*", "session_info.ff1pkl"))):
+        with open(path, "rb") as f:
+            info = pickle.load(f)["data"]
+        meeting = info["Meeting"]
+        start = pd.Timestamp(info["StartDate"])
+        events.append({
+            "RoundNumber": meeting["Number"],
+            "Country": meeting["Country"]["Name"],
+            "Location": meeting["Location"],
+            "OfficialEventName": meeting["OfficialName"],
+            "EventDate": start.normalize(),
+            "EventName": meeting["Name"],
+            "EventFormat": "conventional",
+            "Session5": info["Name"],
+            "Session5Date": start.tz_localize(datetime.now().astimezone().tzinfo).tz_convert(None),
+            "Session5DateUtc": start - pd.Timedelta(info["GmtOffset"]),
+            "F1ApiSupport": True
+        })
+    if include_testing and events:
+        testing = events[0]["EventDate"] - pd.Timedelta(days=14)
+        events.insert(0, {
+            "RoundNumber": 0, "Country": "Bahrain", "Location": "Sakhir",
+            "OfficialEventName": "FORMULA 1 PRE-SEASON TESTING", "EventDate": testing,
+            "EventName": "Pre-Season Testing", "EventFormat": "testing", "F1ApiSupport": True
+        })
+    return EventSchedule(pd.DataFrame(events), year=year, _force_default_cols=True)
+
+
+def score_results(results):
+    """Give fixture results positions in their finishing order and descending points
+
+    The fixtures hold no Ergast results, so sessions load without positions or points and
+    never settle; scored, they are stored in the ledger like real results.
+    """
+    import numpy as np
+
+    return results.assign(Position=np.arange(1, len(results) + 1, dtype=float),
+                          Points=np.arange(len(results), 0, -1, dtype=float))
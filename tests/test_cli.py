@@ -0,0 +1,49 @@
+import argparse
+import csv
+import io
+import json
+
+import cli
+
+
+def test_json_keeps_numbers_typed(f1_data, scored_results, capsys):
+    assert cli.run_standings(f1_data, argparse.Namespace(table="drivers", output="json")) == 0
+    leader = json.loads(capsys.readouterr().out)[0]
+    assert leader["position"] == 1
+    assert isinstance(leader["points"], float)
+    assert isinstance(leader["wins"], int)
+
+    assert cli.run_results(f1_data, argparse.Namespace(round=None, output="json")) == 0
+    winner = json.loads(capsys.readouterr().out)[0]
+    assert winner["position"] == 1
+    assert winner["points"] == 20.0
+    assert winner["race_name"] == "Chinese Grand Prix"
+
+
+def test_csv_leaves_missing_values_empty(f1_data, capsys):
+    assert cli.run_results(f1_data, argparse.Namespace(round=1, output="csv")) == 0
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0]["position"] == ""
+    assert rows[0]["time"] == ""
+
+    assert cli.run_schedule(f1_data, argparse.Namespace(output="csv")) == 0
+    rounds = [row["round"] for row in csv.DictReader(io.StringIO(capsys.readouterr().out))]
+    assert rounds == ["0", "1", "2"]
+
+
+def test_text_output_shows_unclassified_drivers_as_dnf(f1_data, capsys):
+    assert cli.run_results(f1_data, argparse.Namespace(round=None, output="text")) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Race Results Chinese Grand Prix 2025"
+    assert lines[2].startswith("DNF")
+
+
+def test_failed_results_print_nothing_to_stdout(f1_data, monkeypatch, capsys):
+    def fail(year, race):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(f1_data, "_race_results", fail)
+    assert cli.run_results(f1_data, argparse.Namespace(round=None, output="text")) == 1
+    output = capsys.readouterr()
+    assert output.out == ""
+    assert "failed to load data" in output.err
@@ -0,0 +1,22 @@
+import asyncio
+
+import dashboard
+from common import DashboardSnapshot
+
+
+def test_tab_cycles_focus_through_the_panels(f1_data, tmp_path):
+    async def run():
+        app = dashboard.F1DashboardApp(f1_data=f1_data, snapshot=DashboardSnapshot(str(tmp_path / "snapshot.json")),
+                                       season=2025)
+        async with app.run_test(headless=True, size=(200, 60)) as pilot:
+            await pilot.pause()
+            assert app.focused.id == "drivers_panel"
+            await pilot.press("tab")
+            assert app.focused.id == "teams_panel"
+            await pilot.press("shift+tab", "shift+tab")
+            assert app.focused.id == "championship_panel"
+            assert app.query_one("#analysis").current == "championship_panel"
+            await pilot.press("tab")
+            assert app.focused.id == "drivers_panel"
+
+    asyncio.run(run())
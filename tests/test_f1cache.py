@@ -0,0 +1,50 @@
+import os
+
+import f1cache
+
+
+def write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+
+
+def test_http_cache_does_not_count_towards_the_budget(tmp_path):
+    write(tmp_path / "fastf1_http_cache.sqlite", 3_000_000)
+    for event in ("2025-03-16_Australian_Grand_Prix", "2025-03-23_Chinese_Grand_Prix"):
+        session = tmp_path / "2025" / event / "Race"
+        write(session / "session_info.ff1pkl", 100_000)
+        write(session / "_extended_timing_data.ff1pkl", 400_000)
+
+    report = f1cache.prune(2_000_000, str(tmp_path))
+
+    assert report["freed_bytes"] == 0
+    assert len(f1cache.scan(str(tmp_path))) == 2
+
+
+def test_prune_trims_heavy_artifacts_first(tmp_path):
+    for event in ("2025-03-16_Australian_Grand_Prix", "2025-03-23_Chinese_Grand_Prix"):
+        session = tmp_path / "2025" / event / "Race"
+        write(session / "session_info.ff1pkl", 100_000)
+        write(session / "_extended_timing_data.ff1pkl", 400_000)
+
+    report = f1cache.prune(700_000, str(tmp_path))
+
+    assert report["trimmed_sessions"] == 1 and report["removed_sessions"] == 0
+    assert report["size_bytes"] == 600_000
+    assert len(f1cache.scan(str(tmp_path))) == 2
+
+
+def test_prune_leaves_kept_seasons_whole(tmp_path):
+    for year, event in ((2024, "2024-03-02_Bahrain_Grand_Prix"), (2025, "2025-03-16_Australian_Grand_Prix")):
+        session = tmp_path / str(year) / event / "Race"
+        write(session / "session_info.ff1pkl", 100_000)
+        write(session / "_extended_timing_data.ff1pkl", 400_000)
+    os.utime(tmp_path / "2024" / "2024-03-02_Bahrain_Grand_Prix" / "Race", (2_000_000_000, 2_000_000_000))
+
+    report = f1cache.prune(0, str(tmp_path), keep_years=(2025,))
+
+    assert report["removed_sessions"] == 1
+    assert report["size_bytes"] == 500_000
+    assert [session["year"] for session in f1cache.scan(str(tmp_path))] == [2025]
+    assert (tmp_path / "2025" / "2025-03-16_Australian_Grand_Prix" / "Race" / "_extended_timing_data.ff1pkl").exists()
@@ -0,0 +1,338 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import f1data
+from tests.fixtures import fixture_schedule
+
+
+def test_testing_is_not_a_completed_race(f1_data):
+    assert f1data.schedule_cache.get(2025)['RoundNumber'].iloc[0] == 0
+    assert 0 not in f1_data.get_completed_races()['RoundNumber'].tolist()
+
+
+def test_season_aggregate_is_memoized_with_testing_in_the_schedule(f1_data, scored_results):
+    aggregate = f1_data.get_season_aggregate()
+    assert aggregate["failed_rounds"] == {}
+    assert aggregate["unsettled_rounds"] == []
+    assert aggregate["rounds"] == (1, 2)
+    assert f1_data.get_season_aggregate() is aggregate
+
+
+def test_season_aggregate_is_not_memoized_before_every_round_has_results(f1_data, scored_results, monkeypatch):
+    def unpublished(year, round_number, session_type):
+        if round_number == 2:
+            return pd.DataFrame(columns=f1data.ResultsLedger.COLUMNS)
+        return scored_results(year, round_number, session_type)
+
+    monkeypatch.setattr(f1data, "_load_round_results", unpublished)
+    aggregate = f1_data.get_season_aggregate()
+    assert aggregate["failed_rounds"] == {}
+    assert aggregate["unsettled_rounds"] == [2]
+    assert not f1data._season_aggregates
+
+    monkeypatch.setattr(f1data, "_load_round_results", scored_results)
+    aggregate = f1_data.get_season_aggregate()
+    assert aggregate["unsettled_rounds"] == []
+    assert np.nansum(aggregate["driver_points"][1]) > 0
+    assert f1_data.get_season_aggregate() is aggregate
+
+
+def test_invalidate_keeps_only_settled_rounds(f1_data, scored_results):
+    f1_data.get_season_aggregate()
+    laps = pd.DataFrame({"LapNumber": [1]})
+    f1data._session_laps.put((2025, 1, 'R'), laps)
+    f1data._session_laps.put((2025, 3, 'R'), laps)
+    f1_data.invalidate()
+
+    assert not f1data._season_aggregates
+    assert f1data.schedule_cache.cached(2025) is None
+    # Round 3 is not on the schedule yet, so it has not settled
+    assert f1data._session_laps.get((2025, 1, 'R')) is not None
+    assert f1data._session_laps.get((2025, 3, 'R')) is None
+
+
+def test_concurrent_rebuilds_and_invalidation(f1_data, scored_results):
+    f1_data.get_season_aggregate()
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def hammer(index):
+        barrier.wait()
+        try:
+            for _ in range(20):
+                if index % 2:
+                    f1_data.invalidate()
+                else:
+                    assert f1_data.get_season_aggregate()["rounds"] == (1, 2)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert f1_data.get_season_aggregate() is f1_data.get_season_aggregate()
+
+
+def test_concurrent_column_store_writes_of_one_key(tmp_path, caplog):
+    store = f1data.ColumnStore(str(tmp_path))
+    frames = [pd.DataFrame({"RoundNumber": np.arange(200) + index, "Driver": [f"D{index}"] * 200})
+              for index in range(8)]
+    barrier = threading.Barrier(len(frames))
+
+    def write(frame):
+        barrier.wait()
+        store.write((2024, "R"), frame)
+
+    threads = [threading.Thread(target=write, args=(frame,)) for frame in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not [record for record in caplog.records if record.levelname == "ERROR"]
+    stored = store.read((2024, "R"))
+    assert any(stored.equals(frame) for frame in frames)
+    assert os.listdir(tmp_path / "2024") == ["R"]
+
+
+def test_race_index_of_a_round_not_yet_raced(f1_data):
+    assert f1_data.get_race_index(2) == 1
+    assert f1_data.get_race_index(3) is None
+
+
+def test_race_index_raises_when_the_schedule_fails_to_load(f1_data, monkeypatch):
+    def fail(year):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(f1data.schedule_cache, "get", fail)
+    with pytest.raises(ConnectionError):
+        f1_data.get_race_index(2)
+
+
+@pytest.mark.parametrize("loader, columns, get", [
+    ("_load_round_laps", f1data.LAP_COLUMNS, lambda f1_data: f1_data.get_lap_analysis()),
+    ("_load_round_timeline", ["Time", "Lap", "Type", "Message"], lambda f1_data: f1_data.get_race_timeline()),
+])
+def test_unpublished_sessions_are_loaded_again(f1_data, monkeypatch, loader, columns, get):
+    loads = []
+
+    def unpublished(year, round_number, session_type):
+        loads.append(round_number)
+        return pd.DataFrame(columns=columns)
+
+    monkeypatch.setattr(f1data, loader, unpublished)
+    get(f1_data)
+    get(f1_data)
+    assert loads == [2, 2]
+
+
+def test_points_matrix_adds_up_sessions_per_round():
+    season = pd.DataFrame({
+        "RoundNumber": [1, 1, 1, 2],
+        "Driver": ["A", "A", "B", "B"],
+        "Points": [25.0, 8.0, 18.0, 25.0]
+    })
+    points = f1data.points_matrix(season, "Driver", ["A", "B"], (1, 2))
+    np.testing.assert_array_equal(points, [[33.0, 18.0], [np.nan, 25.0]])
+
+
+def test_race_strengths_drop_drivers_who_left_the_grid():
+    points = np.array([[25.0, 18.0, 1.0], [25.0, np.nan, 0.0]])
+    strengths = f1data.race_strengths(points)
+    prior = f1data.TITLE_ODDS_PRIOR_POINTS
+    np.testing.assert_allclose(strengths, [25.0 + prior, 0.0, 0.5 + prior])
+
+
+def test_simulated_seasons_hand_out_every_point():
+    strengths = np.array([50.0, 5.0, 1.0] + [0.5] * 9)
+    sessions = (f1data.RACE_POINTS,) * 3 + (f1data.SPRINT_POINTS,)
+    totals = f1data.simulate_seasons(strengths, sessions, 2_000, seed=1)
+    np.testing.assert_allclose(totals.sum(axis=1), 3 * sum(f1data.RACE_POINTS) + sum(f1data.SPRINT_POINTS))
+    assert totals.mean(axis=0).argmax() == 0
+
+
+def test_projection_favours_the_dominant_driver_and_team():
+    driver_points = np.array([100.0, 90.0, 20.0, 10.0], dtype=np.float32)
+    team_points = np.array([110.0, 110.0], dtype=np.float32)
+    driver_teams = np.array([0, 1, 1, 0])
+    strengths = np.array([25.0, 2.0, 2.0, 1.0])
+    projection = f1data.project_championship(driver_points, team_points, driver_teams, strengths,
+                                             (f1data.RACE_POINTS,) * 5, runs=5_000, seed=1)
+
+    assert projection["driver_odds"].sum() == pytest.approx(1.0)
+    assert projection["team_odds"].sum() == pytest.approx(1.0)
+    assert projection["driver_odds"].argmax() == 0
+    assert projection["team_odds"].argmax() == 0
+    # Team points grow by what their current drivers score
+    gained = projection["driver_projected"] - driver_points
+    np.testing.assert_allclose(projection["team_projected"] - team_points,
+                               [gained[[0, 3]].sum(), gained[[1, 2]].sum()], rtol=1e-4)
+
+
+def test_drivers_are_credited_to_the_team_of_their_latest_round(f1_data, scored_results, monkeypatch):
+    def seat_swap(year, round_number, session_type):
+        results = scored_results(year, round_number, session_type)
+        if round_number == 2:
+            results.loc[results['LastName'] == "Lawson", 'TeamName'] = "Racing Bulls"
+        return results
+
+    monkeypatch.setattr(f1data, "_load_round_results", seat_swap)
+    drivers = f1_data.get_season_aggregate()["drivers"].set_index('driver')
+    assert drivers.loc["Liam Lawson", 'team'] == "Racing Bulls"
+
+
+@pytest.fixture
+def sprint_weekend(f1_data, scored_results, monkeypatch):
+    """Round 2 of the fixture season held as a sprint weekend, its sprint finishing in the
+    reverse order of its race"""
+    import fastf1
+
+    def schedule(year, **kwargs):
+        events = fixture_schedule(year, **kwargs)
+        events.loc[events['RoundNumber'] == 2, 'EventFormat'] = "sprint_qualifying"
+        return events
+
+    def load(year, round_number, session_type):
+        results = scored_results(year, round_number, 'R')
+        if session_type == 'S':
+            sprint = results.iloc[::-1]
+            points = np.zeros(len(sprint))
+            points[:len(f1data.SPRINT_POINTS)] = f1data.SPRINT_POINTS
+            return sprint.assign(Position=np.arange(1, len(sprint) + 1, dtype=float), Points=points)
+        return results
+
+    monkeypatch.setattr(fastf1, "get_event_schedule", schedule)
+    monkeypatch.setattr(f1data, "_load_round_results", load)
+    return load
+
+
+def test_sprint_points_count_towards_the_standings(f1_data, sprint_weekend):
+    sessions = [sprint_weekend(2025, 1, 'R'), sprint_weekend(2025, 2, 'R'), sprint_weekend(2025, 2, 'S')]
+    season = pd.concat(sessions).assign(Driver=lambda frame: frame['FirstName'] + " " + frame['LastName'])
+    aggregate = f1_data.get_season_aggregate()
+
+    drivers = aggregate["drivers"].set_index('driver')
+    pd.testing.assert_series_equal(drivers['points'], season.groupby('Driver')['Points'].sum().reindex(drivers.index),
+                                   check_names=False)
+    teams = aggregate["teams"].set_index('team')
+    pd.testing.assert_series_equal(teams['points'], season.groupby('TeamName')['Points'].sum().reindex(teams.index),
+                                   check_names=False)
+
+
+def test_only_grand_prix_wins_count_as_wins(f1_data, sprint_weekend):
+    sprint_winner = sprint_weekend(2025, 2, 'S').iloc[0]
+    race_winners = [sprint_weekend(2025, round_number, 'R').iloc[0] for round_number in (1, 2)]
+    drivers = f1_data.get_season_aggregate()["drivers"].set_index('driver')
+
+    assert drivers['wins'].sum() == 2
+    for winner in race_winners:
+        assert drivers.loc[f"{winner['FirstName']} {winner['LastName']}", 'wins'] >= 1
+    assert drivers.loc[f"{sprint_winner['FirstName']} {sprint_winner['LastName']}", 'wins'] == 0
+
+
+def test_unpublished_sprint_keeps_the_race(f1_data, sprint_weekend, monkeypatch):
+    def unpublished_sprint(year, round_number, session_type):
+        if session_type == 'S':
+            return pd.DataFrame(columns=f1data.ResultsLedger.COLUMNS)
+        return sprint_weekend(year, round_number, session_type)
+
+    monkeypatch.setattr(f1data, "_load_round_results", unpublished_sprint)
+    aggregate = f1_data.get_season_aggregate()
+
+    assert aggregate["rounds"] == (1, 2)
+    assert aggregate["failed_rounds"] == {}
+    assert aggregate["unsettled_rounds"] == [2]
+    assert np.nansum(aggregate["driver_points"][1]) == sum(range(1, 21))
+
+
+RACE_START = pd.Timestamp("2025-03-23 07:00")
+WEEKEND = pd.DataFrame({
+    "RoundNumber": [1],
+    "EventDate": [RACE_START.normalize()],
+    "Session3DateUtc": [RACE_START - pd.Timedelta(days=1)],
+    "Session5DateUtc": [RACE_START]
+})
+
+
+@pytest.mark.parametrize("now, expected", [
+    # An hour into the race, the next poll is when it ends
+    (RACE_START + pd.Timedelta(hours=1), 3600),
+    # Results come in for a few hours after a session ends
+    (RACE_START + pd.Timedelta(hours=2, minutes=30), f1data.RESULTS_POLL_INTERVAL),
+    (RACE_START + pd.Timedelta(hours=4, minutes=59), f1data.RESULTS_POLL_INTERVAL),
+    # The Saturday session ended hours ago and the race is still a day away
+    (RACE_START - pd.Timedelta(hours=12), f1data.IDLE_POLL_INTERVAL),
+    # Between weekends
+    (RACE_START - pd.Timedelta(days=5), f1data.IDLE_POLL_INTERVAL),
+    # After the last session, while its results may still be amended
+    (RACE_START + pd.Timedelta(hours=12), f1data.IDLE_POLL_INTERVAL),
+    # Off-season, once the last results have settled
+    (RACE_START + pd.Timedelta(days=30), None),
+])
+def test_refresh_delay_follows_the_calendar(now, expected):
+    delay = f1data.refresh_delay(WEEKEND, now)
+    assert delay == expected
+    if delay is not None:
+        assert f1data.RESULTS_POLL_INTERVAL <= delay <= f1data.IDLE_POLL_INTERVAL
+
+
+def test_refresh_delay_never_polls_faster_than_the_results_interval():
+    assert f1data.refresh_delay(WEEKEND, RACE_START + pd.Timedelta(hours=1, minutes=59)) == f1data.RESULTS_POLL_INTERVAL
+
+
+def test_refresh_delay_without_session_dates_polls_rarely():
+    assert f1data.refresh_delay(WEEKEND[["RoundNumber", "EventDate"]], RACE_START) == f1data.IDLE_POLL_INTERVAL
+
+
+def lap_table(times):
+    """Laps table of drivers' session times in seconds at the end of each lap"""
+    laps = pd.DataFrame([
+        {"Driver": driver, "LapNumber": lap, "Time": end, "Compound": "MEDIUM"}
+        for driver, ends in times.items() for lap, end in enumerate(ends, start=1)
+    ])
+    return laps.assign(Time=pd.to_timedelta(laps['Time'].astype(float), unit="s"))
+
+
+def test_head_to_head_gap_is_the_first_drivers_lead():
+    comparison = f1data.head_to_head(lap_table({"AAA": [90, 180, 270], "BBB": [91, 183, 268]}), "AAA", "BBB")
+    np.testing.assert_array_equal(comparison["laps"], [1, 2, 3])
+    np.testing.assert_allclose(comparison["gap"], [1.0, 3.0, -2.0])
+    assert f1data._final_delta("AAA", "BBB", comparison) == "BBB 2.000s ahead of AAA after lap 3"
+
+    swapped = f1data.head_to_head(lap_table({"AAA": [90, 180, 270], "BBB": [91, 183, 268]}), "BBB", "AAA")
+    np.testing.assert_allclose(swapped["gap"], [-1.0, -3.0, 2.0])
+
+
+@pytest.mark.parametrize("second_ends, expected", [
+    # Retired after two laps
+    ([91, 183], "AAA completed 1 lap more than BBB"),
+    # Lapped twice and classified two laps down
+    ([95], "AAA completed 2 laps more than BBB"),
+])
+def test_head_to_head_with_a_driver_laps_down(second_ends, expected):
+    comparison = f1data.head_to_head(lap_table({"AAA": [90, 180, 270], "BBB": second_ends}), "AAA", "BBB")
+    assert len(comparison["laps"]) == 3
+    assert np.isnan(comparison["gap"][len(second_ends):]).all()
+    np.testing.assert_array_equal(comparison["completed"], [3, len(second_ends)])
+    assert f1data._final_delta("AAA", "BBB", comparison) == expected
+    assert f1data._final_delta("BBB", "AAA", f1data.head_to_head(
+        lap_table({"AAA": [90, 180, 270], "BBB": second_ends}), "BBB", "AAA")) == expected
+
+
+def test_head_to_head_without_common_laps():
+    untimed = lap_table({"AAA": [np.nan, np.nan], "BBB": [np.nan, np.nan]})
+    comparison = f1data.head_to_head(untimed, "AAA", "BBB")
+    assert np.isnan(comparison["gap"]).all()
+    assert f1data._final_delta("AAA", "BBB", comparison) == "No laps in common"
+
+    missing = f1data.head_to_head(lap_table({"AAA": [90, 180]}), "CCC", "DDD")
+    assert len(missing["laps"]) == 0
+    assert f1data._final_delta("CCC", "DDD", missing) == "No laps in common"
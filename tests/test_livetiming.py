@@ -0,0 +1,66 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import livetiming
+
+
+def test_parse_message_with_a_feed_timestamp():
+    line = "['LapCount', {'CurrentLap': 12, 'TotalLaps': 57}, '2025-03-16T04:35:07.6314592Z']\n"
+    topic, data, timestamp = livetiming.parse_message(line)
+    assert topic == "LapCount" and data == {"CurrentLap": 12, "TotalLaps": 57}
+    assert timestamp == datetime(2025, 3, 16, 4, 35, 7, 631459, tzinfo=timezone.utc)
+
+
+def test_parse_timestamp_pads_short_fractions():
+    assert livetiming.parse_timestamp("2025-03-16T04:35:07.63Z").microsecond == 630000
+    assert livetiming.parse_timestamp("2025-03-16T04:35:07+01:00").utcoffset() == timedelta(hours=1)
+
+
+def test_apply_tracks_changed_drivers():
+    state = livetiming.LiveState()
+    state.apply("DriverList", {"1": {"Tla": "VER", "Line": 1}, "_kf": True})
+    state.apply("TimingData", {"Lines": {"1": {"Position": "1", "NumberOfLaps": 3}}})
+    assert state.take_changes() == ({"1"}, False)
+    assert state.driver_row("1")[:2] == ["1", "VER"]
+
+
+class FakeClient:
+    """Stands in for fastf1's SignalRClient: records one message, then runs until it times out"""
+    clients = []
+
+    def __init__(self, filename, timeout=60, logger=None):
+        self.filename = filename
+        self.timeout = timeout
+        self.stopped = threading.Event()
+        self.clients.append(self)
+
+    def start(self):
+        with open(self.filename, "w") as f:
+            f.write("['LapCount', {'CurrentLap': 1}, '2025-03-16T04:03:11.1234567Z']\n")
+            f.flush()
+            while self.timeout >= 0:
+                time.sleep(0.01)
+        self.stopped.set()
+
+
+def test_follow_live_stops_the_client(tmp_path, monkeypatch):
+    import fastf1.livetiming.client
+
+    monkeypatch.setattr(fastf1.livetiming.client, "SignalRClient", FakeClient)
+    messages = livetiming.follow_live(path=str(tmp_path / "live.txt"))
+    assert next(messages)[0] == "LapCount"
+    messages.close()
+    assert FakeClient.clients[-1].stopped.wait(1)
+
+
+def test_cancelled_follow_live_stops_the_client(tmp_path, monkeypatch):
+    import fastf1.livetiming.client
+
+    monkeypatch.setattr(fastf1.livetiming.client, "SignalRClient", FakeClient)
+    cancelled = threading.Event()
+    messages = livetiming.follow_live(cancelled.is_set, path=str(tmp_path / "live.txt"))
+    assert next(messages)[0] == "LapCount"
+    cancelled.set()
+    assert list(messages) == []
+    assert FakeClient.clients[-1].stopped.wait(1)
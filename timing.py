@@ -0,0 +1,116 @@
+"""Timing spans and counters showing where lazyf1 spends its time.
+
+Spans time a block of code and are aggregated per name; counters count cache hits,
+misses and the like. Spans slower than ``SLOW_SPAN_SECONDS`` are also logged, so slow
+rounds show up in the log file without attaching a profiler. The status bar shows the
+live numbers and ``lazyf1 --profile`` prints the aggregated report at exit.
+
+Only the standard library is imported here, so every module can record timings.
+"""
+
+import functools
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Spans taking longer than this many seconds are logged as they finish
+SLOW_SPAN_SECONDS = 2.0
+
+
+class Timings:
+    """Thread-safe per-name span aggregates and counters"""
+    def __init__(self):
+        self.spans = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, detail=None):
+        """Add a finished span of the given duration"""
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0}
+            span["calls"] += 1
+            span["total_s"] += seconds
+            span["max_s"] = max(span["max_s"], seconds)
+            span["last_s"] = seconds
+            span["ended_at"] = time.time()
+        if seconds >= SLOW_SPAN_SECONDS:
+            logging.info(f"Slow {name}{f' ({detail})' if detail else ''}: {seconds:.2f}s")
+
+    @contextmanager
+    def span(self, name, detail=None):
+        """Time the enclosed block as a span, including when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, detail)
+
+    def timed(self, name=None):
+        """Decorator timing every call of a function as a span named after it"""
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get_span(self, name):
+        """Copy of a span's aggregate, or None if it has not been recorded"""
+        with self._lock:
+            span = self.spans.get(name)
+            return dict(span) if span is not None else None
+
+    def latest(self, prefix):
+        """Copy of the most recently finished span whose name starts with prefix, or None"""
+        with self._lock:
+            spans = [span for name, span in self.spans.items() if name.startswith(prefix)]
+            return dict(max(spans, key=lambda span: span["ended_at"])) if spans else None
+
+    def cache_counts(self):
+        """Hits and misses summed over every ``<cache>.hits`` and ``<cache>.misses`` counter"""
+        with self._lock:
+            hits = sum(value for name, value in self.counters.items() if name.endswith(".hits"))
+            misses = sum(value for name, value in self.counters.items() if name.endswith(".misses"))
+        return hits, misses
+
+    def report(self):
+        """Spans by total time, then counters, as aligned text"""
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda item: item[1]["total_s"], reverse=True)
+            counters = sorted(self.counters.items())
+        lines = [f"{'span':44} {'calls':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9}"]
+        for name, span in spans:
+            lines.append(f"{name:44} {span['calls']:>6} {span['total_s']:>9.3f} "
+                         f"{span['total_s'] / span['calls'] * 1000:>9.1f} {span['max_s'] * 1000:>9.1f}")
+        if counters:
+            lines.append("")
+            lines.append(f"{'counter':44} {'value':>6}")
+            lines.extend(f"{name:44} {value:>6}" for name, value in counters)
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+
+timings = Timings()
+span = timings.span
+timed = timings.timed
+count = timings.count
+
+
+def print_report(file=None):
+    """Print the aggregated timings, for ``lazyf1 --profile``"""
+    print(timings.report(), file=file or sys.stderr)